@@ -0,0 +1,148 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+Databases created before migrations existed already have these tables
+(``Base.metadata.create_all``), so every table and column is only created
+when missing and upgrading such a database just records the revision.
+When generating SQL (``alembic upgrade --sql``) there is no database to
+inspect, and the full schema is emitted.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Enum columns store the member names, as SQLAlchemy does for Python enums
+ENUMS = {
+    "supermarketsector": ("HORTIFRUTI", "MERCEARIA", "LIMPEZA", "CONGELADOS", "PADARIA", "BEBIDAS", "HIGIENE"),
+    "jobkind": ("SHOPPING_LIST", "RECIPE_INGREDIENTS"),
+    "jobstatus": ("PENDING", "RUNNING", "SUCCEEDED", "FAILED"),
+}
+
+
+def _enum(name: str) -> sa.Enum:
+    # Postgres types are created once, up front, since several tables share them
+    return sa.Enum(*ENUMS[name], name=name).with_variant(
+        postgresql.ENUM(*ENUMS[name], name=name, create_type=False), "postgresql"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    def missing(table: str) -> bool:
+        return inspector is None or not inspector.has_table(table)
+
+    for name, values in ENUMS.items():
+        sa.Enum(*values, name=name).create(bind, checkfirst=not offline)
+
+    if missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if missing("shopping_lists"):
+        op.create_table(
+            "shopping_lists",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_shopping_lists_id", "shopping_lists", ["id"])
+
+    if missing("items"):
+        op.create_table(
+            "items",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("quantity", sa.Float(), nullable=False),
+            sa.Column("unit", sa.String(), nullable=False),
+            sa.Column("sector", _enum("supermarketsector"), nullable=True),
+            sa.Column("sector_pending", sa.Boolean(), server_default=sa.false(), nullable=False),
+            sa.Column("is_purchased", sa.Boolean(), nullable=True),
+            sa.Column("shopping_list_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["shopping_list_id"], ["shopping_lists.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_items_id", "items", ["id"])
+    elif inspector is not None and "sector_pending" not in {column["name"] for column in inspector.get_columns("items")}:
+        # Added with background classification; create_all never adds columns to existing tables
+        op.add_column("items", sa.Column("sector_pending", sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    if missing("product_classifications"):
+        op.create_table(
+            "product_classifications",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("normalized_name", sa.String(), nullable=False),
+            sa.Column("model", sa.String(), nullable=False),
+            sa.Column("sector", _enum("supermarketsector"), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("normalized_name", "model", name="uq_product_classifications_name_model"),
+        )
+        op.create_index("ix_product_classifications_id", "product_classifications", ["id"])
+
+    if missing("generation_jobs"):
+        op.create_table(
+            "generation_jobs",
+            sa.Column("id", sa.String(length=36), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("kind", _enum("jobkind"), nullable=False),
+            sa.Column("params", sa.JSON(), nullable=False),
+            sa.Column("status", _enum("jobstatus"), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("locked_by", sa.String(), nullable=True),
+            sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("shopping_list_id", sa.Integer(), nullable=True),
+            sa.Column("result", sa.JSON(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.ForeignKeyConstraint(["shopping_list_id"], ["shopping_lists.id"], ondelete="SET NULL"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_generation_jobs_user_id", "generation_jobs", ["user_id"])
+        op.create_index("ix_generation_jobs_status_run_after", "generation_jobs", ["status", "run_after"])
+
+
+def downgrade() -> None:
+    op.drop_table("generation_jobs")
+    op.drop_table("product_classifications")
+    op.drop_table("items")
+    op.drop_table("shopping_lists")
+    op.drop_table("users")
+    bind = op.get_bind()
+    for name, values in ENUMS.items():
+        sa.Enum(*values, name=name).drop(bind, checkfirst=True)
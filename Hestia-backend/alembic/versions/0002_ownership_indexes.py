@@ -0,0 +1,60 @@
+"""Indexes for ownership joins and list pagination
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:30:00.000000
+
+Every ownership check joins items to shopping_lists and filters on
+shopping_lists.user_id, and neither foreign key had an index. The leading
+column of each composite index covers its foreign key, so no separate
+single-column indexes are added.
+
+On Postgres the indexes are built with CREATE INDEX CONCURRENTLY outside
+the migration transaction, so this can run against a live database
+without blocking writes. A concurrent build that fails leaves an INVALID
+index behind; it is dropped and rebuilt when the migration runs again.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_shopping_lists_user_id_created_at", "shopping_lists", ["user_id", "created_at"]),
+    ("ix_items_shopping_list_id_sector", "items", ["shopping_list_id", "sector"]),
+)
+
+
+def _drop_invalid_index(name: str) -> None:
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    context = op.get_context()
+    # Invalid indexes can only be looked up against a live database, not when generating SQL
+    check_invalid = context.dialect.name == "postgresql" and not context.as_sql
+    # CONCURRENTLY cannot run inside a transaction
+    with context.autocommit_block():
+        for name, table, columns in INDEXES:
+            if check_invalid:
+                _drop_invalid_index(name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,42 @@
+"""Index shopping lists by owner and id for keyset pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+List pagination now keys on id alone instead of (created_at, id), so
+the owner index is rebuilt on (user_id, id): every page is a range scan
+of that index. Like 0002, the indexes are built and dropped
+CONCURRENTLY outside the migration transaction on Postgres.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = ("ix_shopping_lists_user_id_created_at", "shopping_lists", ["user_id", "created_at"])
+NEW_INDEX = ("ix_shopping_lists_user_id_id", "shopping_lists", ["user_id", "id"])
+
+
+def _replace_index(old, new) -> None:
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        name, table, columns = new
+        # A failed concurrent build leaves an INVALID index behind; dropping
+        # first rebuilds it when the migration runs again
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        # The new index goes in before the old one is dropped, so the user_id foreign key is never left unindexed
+        op.create_index(name, table, columns, postgresql_concurrently=True)
+        op.drop_index(old[0], table_name=old[1], postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    _replace_index(OLD_INDEX, NEW_INDEX)
+
+
+def downgrade() -> None:
+    _replace_index(NEW_INDEX, OLD_INDEX)
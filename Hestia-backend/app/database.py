@@ -1,22 +1,201 @@
-from sqlalchemy import create_engine
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .metrics import Histogram
 
-# Create database engine
-engine = create_engine(settings.database_url)
+# Async drivers used by the request handlers, by sync driver name
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """Same database as ``database_url``, through its async driver"""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Checkout wait times, overflow use and timeouts of one connection pool"""
+
+    def __init__(self):
+        self.wait_seconds = Histogram(POOL_WAIT_BUCKETS)
+        self.overflow_checkouts = 0  # Checkouts that needed a connection beyond pool_size
+        self.timeouts = 0  # Checkouts that gave up after db_pool_timeout_seconds
+
+
+class TimedCheckoutMixin:
+    """Pool that records how long each checkout waited, including opening a new connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.wait_seconds.observe(time.perf_counter() - started)
+        if self.checkedout() > self.size():
+            self.metrics.overflow_checkouts += 1
+        return connection
+
+
+class TimedQueuePool(TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(database_url: str, pool_size: int, asynchronous: bool) -> Dict[str, Any]:
+    """Pool and connection arguments from the settings; other databases keep SQLAlchemy's defaults"""
+    if make_url(database_url).get_backend_name() != "postgresql":
+        return {}
+    connect_args: Dict[str, Any] = {}
+    if settings.db_pgbouncer_transaction_mode:
+        if asynchronous:
+            # Consecutive statements may run on different server connections, so
+            # asyncpg must not cache prepared statements or reuse their names
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    elif settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if asynchronous:
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+    return {
+        "poolclass": TimedAsyncQueuePool if asynchronous else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+# Create database engine (background workers, warm-up and migrations)
+engine = create_engine(
+    settings.database_url,
+    **engine_options(settings.database_url, settings.db_background_pool_size, asynchronous=False)
+)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so queries never block the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    **engine_options(settings.database_url, settings.db_pool_size, asynchronous=True)
+)
+
+# Objects stay usable after commit: lazy loads are not possible with
+# AsyncSession, so relationships must be loaded eagerly where needed
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
 
-def get_db():
+async def get_db() -> AsyncIterator[AsyncSession]:
     """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Short-lived session for work done between slow awaits.
+
+    Handlers that wait on the model use one scope to authenticate and
+    another to persist, so no pooled connection stays checked out while
+    the model is generating. Rolls back on error; commits are explicit."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def warm_up_connections(count: int) -> int:
+    """Open up to ``count`` pooled connections and return them to the pool; returns how many"""
+    pool_size = getattr(engine.pool, "size", None)
+    if callable(pool_size):
+        # Connections beyond the pool size are overflow and would be discarded on return
+        count = min(count, pool_size())
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def warm_up_async_connections(count: int) -> int:
+    """Same as ``warm_up_connections`` for the pool the request handlers use"""
+    pool_size = getattr(async_engine.pool, "size", None)
+    if callable(pool_size):
+        count = min(count, pool_size())
+    connections = []
+    try:
+        for _ in range(count):
+            connection = await async_engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
     finally:
-        db.close() 
\ No newline at end of file
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
+def pool_stats(pool_engine: Engine) -> Dict[str, Any]:
+    pool = pool_engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0)
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "wait_seconds": metrics.wait_seconds.snapshot(),
+            "overflow_checkouts": metrics.overflow_checkouts,
+            "timeouts": metrics.timeouts
+        })
+    return stats
+
+
+def database_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        "requests": pool_stats(async_engine.sync_engine),
+        "background": pool_stats(engine)
+    }
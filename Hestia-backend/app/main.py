@@ -1,13 +1,22 @@
-from fastapi import FastAPI, Depends
+import math
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.openapi.utils import get_openapi
-from sqlalchemy.orm import Session
-from .database import engine, get_db, Base
+from .database import async_engine, database_stats, engine, Base
 from .routers import auth_router, users_router, shopping_lists_router, items_router, ai_router
+from .services.ai_service import ollama_service
+from .services.classification_cache import classification_cache
+from .services.classification_worker import classification_worker
+from .services.generation_cache import generation_cache
+from .services.job_queue import job_queue
+from .services.scheduler import InferenceOverloaded
+from .services.telemetry import inference_telemetry
+from .services.warmup import warmup
 from .config import settings
 
-# Create database tables
+# Create missing tables for local development; existing databases are
+# upgraded with the Alembic migrations (alembic upgrade head)
 Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
@@ -53,8 +62,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Cursor pagination of shopping lists and their items
 )
 
+@app.on_event("startup")
+async def startup():
+    """Open long-lived resources shared by all requests of this worker"""
+    await ollama_service.startup()
+    warmup.start()
+    job_queue.start()
+    await classification_worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release long-lived resources"""
+    await classification_worker.stop()
+    await job_queue.stop()
+    await warmup.stop()
+    await ollama_service.shutdown()
+    await async_engine.dispose()
+
+
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded_handler(request: Request, exc: InferenceOverloaded):
+    """Answer fast with 429/503 when the model cannot take more work"""
+    headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=headers)
+
+
 # Include routers
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(users_router, prefix="/api/v1")
@@ -106,8 +142,27 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "hestia-api"}
+    """Health check endpoint; 503 while the startup warm-up is still running"""
+    content = {
+        "status": "healthy" if warmup.ready else "starting",
+        "service": "hestia-api",
+        "ollama_circuit": ollama_service.breaker.state.value
+    }
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=content)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for monitoring"""
+    return {
+        "classification_cache": classification_cache.stats(),
+        "generation_cache": generation_cache.stats(),
+        "classification_worker": classification_worker.stats(),
+        "ollama": ollama_service.stats(),
+        "inference": inference_telemetry.stats(),
+        "warmup": warmup.stats(),
+        "database": database_stats()
+    }
 
 
 @app.get("/api/v1/")
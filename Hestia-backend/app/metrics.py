@@ -0,0 +1,29 @@
+import bisect
+from typing import Dict, Sequence
+
+
+class Histogram:
+    """Cumulative bucket counts plus sum and count, Prometheus style"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self._counts):
+            running += count
+            cumulative[str(bound)] = running
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "buckets": cumulative
+        }
@@ -1,5 +1,7 @@
 from .user import User
 from .shopping_list import ShoppingList
 from .item import Item, SupermarketSector
+from .product_classification import ProductClassification
+from .generation_job import GenerationJob, JobStatus, JobKind
 
-__all__ = ["User", "ShoppingList", "Item", "SupermarketSector"] 
\ No newline at end of file
+__all__ = ["User", "ShoppingList", "Item", "SupermarketSector", "ProductClassification", "GenerationJob", "JobStatus", "JobKind"]
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, JSON, Text, Index
+from sqlalchemy.sql import func
+import enum
+import uuid
+from ..database import Base
+
+
+class JobStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobKind(enum.Enum):
+    SHOPPING_LIST = "shopping_list"
+    RECIPE_INGREDIENTS = "recipe_ingredients"
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(Enum(JobKind), nullable=False)
+    params = Column(JSON, nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    shopping_list_id = Column(Integer, ForeignKey("shopping_lists.id", ondelete="SET NULL"), nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<GenerationJob(id='{self.id}', kind='{self.kind}', status='{self.status}')>"
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Enum, DateTime
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Enum, DateTime, Index
+from sqlalchemy.sql import false, func
 from sqlalchemy.orm import relationship
 import enum
 from ..database import Base
@@ -17,12 +17,18 @@ class SupermarketSector(enum.Enum):
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # Ownership joins and per-sector stats; also serves as the shopping_list_id FK index
+        Index("ix_items_shopping_list_id_sector", "shopping_list_id", "sector"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     quantity = Column(Float, nullable=False, default=1.0)
     unit = Column(String, nullable=False, default="un")
     sector = Column(Enum(SupermarketSector), nullable=True)
+    sector_pending = Column(Boolean, nullable=False, default=False, server_default=false())  # Being classified in the background
     is_purchased = Column(Boolean, default=False)
     shopping_list_id = Column(Integer, ForeignKey("shopping_lists.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
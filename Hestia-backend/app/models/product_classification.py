@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+from .item import SupermarketSector
+
+
+class ProductClassification(Base):
+    __tablename__ = "product_classifications"
+    __table_args__ = (
+        UniqueConstraint("normalized_name", "model", name="uq_product_classifications_name_model"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    normalized_name = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    sector = Column(Enum(SupermarketSector), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ProductClassification(name='{self.normalized_name}', model='{self.model}', sector='{self.sector}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -6,6 +6,12 @@ from ..database import Base
 
 class ShoppingList(Base):
     __tablename__ = "shopping_lists"
+    __table_args__ = (
+        # Ownership filters and newest-first pagination; also serves as the user_id FK index
+        Index("ix_shopping_lists_user_id_id", "user_id", "id"),
+    )
+    # Fetch server-generated timestamps with RETURNING, since async sessions cannot lazy-load them
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
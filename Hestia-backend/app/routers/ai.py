@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, session_scope
 from ..schemas.ai import (
     ProductClassificationRequest, ProductClassificationResponse,
+    BatchClassificationRequest, BatchClassificationItem, BatchClassificationResponse,
     ListGenerationRequest, ListGenerationResponse,
     RecipeIngredientsRequest, RecipeIngredientsResponse,
+    GenerationJobResponse,
     SuggestionRequest, SuggestionResponse
 )
 from ..schemas.item import ItemCreate
@@ -13,17 +20,96 @@ from ..schemas.shopping_list import ShoppingListCreate
 from ..services.auth import get_current_user
 from ..services.ai_service import ollama_service
 from ..services.shopping_service import shopping_service
+from ..services.job_queue import job_queue
 from ..models.user import User
+from ..models.generation_job import JobKind, JobStatus
 
 router = APIRouter(prefix="/ai", tags=["🤖 Inteligência Artificial"])
 security = HTTPBearer()
 
 
+async def _authenticate(credentials: HTTPAuthorizationCredentials) -> int:
+    """Resolve the user's id with a session that is closed before any model call"""
+    async with session_scope() as db:
+        user = await get_current_user(db, credentials.credentials)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return user.id
+
+
+def _to_item_creates(items: List[Dict]) -> List[ItemCreate]:
+    """Validate generated or client-sent items before saving them"""
+    return [
+        ItemCreate(
+            name=item["name"],
+            quantity=item["quantity"],
+            unit=item["unit"],
+            sector=item.get("sector")
+        )
+        for item in items
+    ]
+
+
+def _wants_sse(http_request: Request) -> bool:
+    """Clients asking for text/event-stream get SSE, everyone else NDJSON"""
+    return "text/event-stream" in http_request.headers.get("accept", "")
+
+
+def _format_event(event: str, data: Dict, sse: bool) -> str:
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+async def _stream_and_save(
+    items_stream: AsyncIterator[Dict],
+    user_id: int,
+    shopping_list_data: ShoppingListCreate,
+    sse: bool
+) -> AsyncIterator[str]:
+    """Forward each generated item as an event, then save the complete list.
+    
+    The list is saved with a session opened only once generation has
+    finished, so no connection is held while the model streams."""
+    items: List[Dict] = []
+    async for item in items_stream:
+        items.append(item)
+        yield _format_event("item", item, sse)
+    
+    try:
+        async with session_scope() as db:
+            shopping_list, _ = await shopping_service.create_shopping_list_with_items(
+                db, user_id, shopping_list_data, _to_item_creates(items)
+            )
+        yield _format_event("done", {
+            "shopping_list_id": shopping_list.id,
+            "total_items": len(items),
+            "message": f"Lista criada e salva automaticamente com ID: {shopping_list.id}"
+        }, sse)
+    except Exception as e:
+        yield _format_event("done", {
+            "shopping_list_id": None,
+            "total_items": len(items),
+            "message": f"Lista gerada pela IA, mas não foi possível salvar automaticamente: {str(e)}"
+        }, sse)
+
+
+def _event_stream_response(events: AsyncIterator[str], sse: bool) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/classify-product", response_model=ProductClassificationResponse)
 async def classify_product(
     request: ProductClassificationRequest,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     ## Classificar Produto com IA
@@ -61,41 +147,102 @@ async def classify_product(
     ```json
     {
         "product_name": "Banana",
-        "sector": "hortifruti"
+        "sector": "hortifruti",
+        "confidence": 1.0
     }
     ```
     
+    **Confiança:**
+    - Produtos comuns são classificados localmente por um léxico, sem chamar a IA
+    - `confidence` indica a certeza do léxico (0 a 1); é `null` quando a resposta veio da IA ou do cache
+    
     **Como usar:**
     - Envie o nome do produto
     - A IA retornará o setor correto
     - Use essa informação ao adicionar itens às listas
     """
-    user = get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    await _authenticate(credentials)
     
-    sector = await ollama_service.classify_product(request.product_name)
-    if not sector:
+    result = await ollama_service.classify_product_with_confidence(request.product_name)
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to classify product"
         )
     
+    sector, confidence = result
     return ProductClassificationResponse(
         product_name=request.product_name,
-        sector=sector
+        sector=sector,
+        confidence=confidence
+    )
+
+
+@router.post("/classify-products", response_model=BatchClassificationResponse)
+async def classify_products(
+    request: BatchClassificationRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    ## Classificar Vários Produtos com IA
+    
+    Classifica uma lista de produtos de uma só vez. Produtos conhecidos são resolvidos localmente
+    (léxico e cache) e os demais são enviados à IA em um único prompt, em vez de uma chamada por produto.
+    
+    **Autenticação necessária:**
+    - Token JWT no header: `Authorization: Bearer {token}`
+    
+    **Dados necessários:**
+    - **product_names**: Lista de nomes de produtos (1 a 200)
+    
+    **Exemplo de uso:**
+    ```json
+    {
+        "product_names": ["Banana", "Detergente", "Picanha"]
+    }
+    ```
+    
+    **Resposta:**
+    - `200`: Produtos classificados (setor `null` para os que a IA não conseguiu classificar)
+    - `401`: Token inválido ou expirado
+    - `422`: Lista vazia ou com mais de 200 produtos
+    
+    **Exemplo de resposta:**
+    ```json
+    {
+        "items": [
+            {"product_name": "Banana", "sector": "hortifruti", "confidence": 1.0},
+            {"product_name": "Detergente", "sector": "limpeza", "confidence": 1.0},
+            {"product_name": "Picanha", "sector": "mercearia", "confidence": 1.0}
+        ],
+        "total_items": 3,
+        "classified_items": 3
+    }
+    ```
+    """
+    await _authenticate(credentials)
+    
+    results = await ollama_service.classify_products(request.product_names)
+    
+    items = [
+        BatchClassificationItem(
+            product_name=product_name,
+            sector=result[0] if result else None,
+            confidence=result[1] if result else None
+        )
+        for product_name, result in zip(request.product_names, results)
+    ]
+    return BatchClassificationResponse(
+        items=items,
+        total_items=len(items),
+        classified_items=sum(1 for item in items if item.sector)
     )
 
 
 @router.post("/generate-list", response_model=ListGenerationResponse)
 async def generate_shopping_list(
     request: ListGenerationRequest,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     ## Gerar Lista de Compras com IA
@@ -150,13 +297,7 @@ async def generate_shopping_list(
     - Quantidades calculadas baseadas no número de pessoas
     - Produtos relevantes para o tema escolhido
     """
-    user = get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user_id = await _authenticate(credentials)
     
     items = await ollama_service.generate_shopping_list(request.theme, request.people_count)
     if not items:
@@ -173,19 +314,11 @@ async def generate_shopping_list(
             description=f"Lista gerada automaticamente pela IA para {request.theme} ({request.people_count} pessoas)"
         )
         
-        # Create the shopping list
-        shopping_list = await shopping_service.create_shopping_list(db, user.id, shopping_list_data)
-        
-        # Add all generated items to the list
-        for item in items:
-            item_data = ItemCreate(
-                name=item["name"],
-                quantity=item["quantity"],
-                unit=item["unit"],
-                sector=item["sector"],
-                shopping_list_id=shopping_list.id
+        # Create the shopping list and all generated items in one transaction
+        async with session_scope() as db:
+            shopping_list, _ = await shopping_service.create_shopping_list_with_items(
+                db, user_id, shopping_list_data, _to_item_creates(items)
             )
-            await shopping_service.add_item_to_list(db, shopping_list.id, user.id, item_data)
         
         return ListGenerationResponse(
             theme=request.theme,
@@ -205,11 +338,55 @@ async def generate_shopping_list(
             )
 
 
+@router.post("/generate-list/stream")
+async def stream_shopping_list(
+    request: ListGenerationRequest,
+    http_request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    ## Gerar Lista de Compras com IA (streaming)
+    
+    Mesma geração de `/ai/generate-list`, mas cada item é enviado ao cliente assim que a IA termina de escrevê-lo.
+    Ao final a lista é salva automaticamente.
+    
+    **Autenticação necessária:**
+    - Token JWT no header: `Authorization: Bearer {token}`
+    
+    **Formato da resposta:**
+    - `application/x-ndjson` (padrão): um objeto JSON por linha
+    - `text/event-stream`: Server-Sent Events, quando o header `Accept: text/event-stream` é enviado
+    
+    **Eventos:**
+    - `item`: um item da lista (`name`, `quantity`, `unit`, `sector`)
+    - `done`: fim da geração, com `shopping_list_id`, `total_items` e `message`
+    
+    **Exemplo (NDJSON):**
+    ```
+    {"event": "item", "data": {"name": "carne bovina", "quantity": 2.0, "unit": "kg", "sector": "mercearia"}}
+    {"event": "done", "data": {"shopping_list_id": 12, "total_items": 10, "message": "..."}}
+    ```
+    """
+    user_id = await _authenticate(credentials)
+    
+    sse = _wants_sse(http_request)
+    shopping_list_data = ShoppingListCreate(
+        name=f"Lista IA: {request.theme}",
+        description=f"Lista gerada automaticamente pela IA para {request.theme} ({request.people_count} pessoas)"
+    )
+    events = _stream_and_save(
+        ollama_service.stream_shopping_list(request.theme, request.people_count),
+        user_id,
+        shopping_list_data,
+        sse
+    )
+    return _event_stream_response(events, sse)
+
+
 @router.post("/save-ai-list", response_model=dict)
 async def save_ai_generated_list(
     request: dict,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     ## Salvar Lista Gerada pela IA
@@ -240,13 +417,7 @@ async def save_ai_generated_list(
     - `401`: Token inválido ou expirado
     - `500`: Erro ao salvar a lista
     """
-    user = get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user_id = await _authenticate(credentials)
     
     try:
         # Create the shopping list
@@ -255,19 +426,11 @@ async def save_ai_generated_list(
             description=f"Lista gerada automaticamente pela IA para {request['theme']} ({request['people_count']} pessoas)"
         )
         
-        # Create the shopping list
-        shopping_list = await shopping_service.create_shopping_list(db, user.id, shopping_list_data)
-        
-        # Add all generated items to the list
-        for item in request['items']:
-            item_data = ItemCreate(
-                name=item["name"],
-                quantity=item["quantity"],
-                unit=item["unit"],
-                sector=item["sector"],
-                shopping_list_id=shopping_list.id
+        # Create the shopping list and all its items in one transaction
+        async with session_scope() as db:
+            shopping_list, _ = await shopping_service.create_shopping_list_with_items(
+                db, user_id, shopping_list_data, _to_item_creates(request['items'])
             )
-            await shopping_service.add_item_to_list(db, shopping_list.id, user.id, item_data)
         
         return {
             "message": "Lista da IA salva com sucesso!",
@@ -287,8 +450,7 @@ async def save_ai_generated_list(
 @router.post("/recipe-ingredients", response_model=RecipeIngredientsResponse)
 async def generate_recipe_ingredients(
     request: RecipeIngredientsRequest,
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
     ## Gerar Ingredientes para Receita
@@ -349,13 +511,7 @@ async def generate_recipe_ingredients(
     - Dificuldade da receita considerada
     - Ingredientes organizados por setores do supermercado
     """
-    user = get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user_id = await _authenticate(credentials)
     
     ingredients = await ollama_service.generate_recipe_ingredients(
         request.recipe_name, 
@@ -377,19 +533,11 @@ async def generate_recipe_ingredients(
             description=f"Lista de ingredientes para {request.recipe_name} ({request.people_count} pessoas) - Dificuldade: {request.difficulty}"
         )
         
-        # Create the shopping list
-        shopping_list = await shopping_service.create_shopping_list(db, user.id, shopping_list_data)
-        
-        # Add all generated ingredients to the list
-        for ingredient in ingredients:
-            item_data = ItemCreate(
-                name=ingredient["name"],
-                quantity=ingredient["quantity"],
-                unit=ingredient["unit"],
-                sector=ingredient["sector"],
-                shopping_list_id=shopping_list.id
+        # Create the shopping list and all generated ingredients in one transaction
+        async with session_scope() as db:
+            shopping_list, _ = await shopping_service.create_shopping_list_with_items(
+                db, user_id, shopping_list_data, _to_item_creates(ingredients)
             )
-            await shopping_service.add_item_to_list(db, shopping_list.id, user.id, item_data)
         
         return RecipeIngredientsResponse(
             recipe_name=request.recipe_name,
@@ -411,14 +559,161 @@ async def generate_recipe_ingredients(
         )
 
 
+@router.post("/recipe-ingredients/stream")
+async def stream_recipe_ingredients(
+    request: RecipeIngredientsRequest,
+    http_request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    ## Gerar Ingredientes para Receita (streaming)
+    
+    Mesma geração de `/ai/recipe-ingredients`, mas cada ingrediente é enviado assim que fica pronto.
+    Ao final a lista de ingredientes é salva automaticamente.
+    
+    **Autenticação necessária:**
+    - Token JWT no header: `Authorization: Bearer {token}`
+    
+    **Formato da resposta:**
+    - `application/x-ndjson` (padrão) ou `text/event-stream` com `Accept: text/event-stream`
+    - Eventos `item` (um por ingrediente) e `done` (com `shopping_list_id`, `total_items` e `message`)
+    """
+    user_id = await _authenticate(credentials)
+    
+    sse = _wants_sse(http_request)
+    shopping_list_data = ShoppingListCreate(
+        name=f"Ingredientes: {request.recipe_name}",
+        description=f"Lista de ingredientes para {request.recipe_name} ({request.people_count} pessoas) - Dificuldade: {request.difficulty}"
+    )
+    events = _stream_and_save(
+        ollama_service.stream_recipe_ingredients(request.recipe_name, request.people_count, request.difficulty),
+        user_id,
+        shopping_list_data,
+        sse
+    )
+    return _event_stream_response(events, sse)
+
+
+@router.post("/jobs/generate-list", response_model=GenerationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_shopping_list_job(
+    request: ListGenerationRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Gerar Lista de Compras em Segundo Plano
+    
+    Enfileira a geração de uma lista por tema e retorna imediatamente o ID do job.
+    A lista é gerada por um worker e salva automaticamente; acompanhe em `GET /ai/jobs/{job_id}`.
+    
+    **Autenticação necessária:**
+    - Token JWT no header: `Authorization: Bearer {token}`
+    
+    **Dados necessários:**
+    - Os mesmos de `/ai/generate-list` (`theme`, `people_count`)
+    
+    **Resposta:**
+    - `202`: Job criado com status `pending`
+    - `401`: Token inválido ou expirado
+    """
+    user = await get_current_user(db, credentials.credentials)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return await job_queue.enqueue(db, user.id, JobKind.SHOPPING_LIST, {
+        "theme": request.theme,
+        "people_count": request.people_count
+    })
+
+
+@router.post("/jobs/recipe-ingredients", response_model=GenerationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_recipe_ingredients_job(
+    request: RecipeIngredientsRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Gerar Ingredientes para Receita em Segundo Plano
+    
+    Enfileira a geração dos ingredientes de uma receita e retorna imediatamente o ID do job.
+    Acompanhe o resultado em `GET /ai/jobs/{job_id}`.
+    
+    **Resposta:**
+    - `202`: Job criado com status `pending`
+    - `401`: Token inválido ou expirado
+    """
+    user = await get_current_user(db, credentials.credentials)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return await job_queue.enqueue(db, user.id, JobKind.RECIPE_INGREDIENTS, {
+        "recipe_name": request.recipe_name,
+        "people_count": request.people_count,
+        "difficulty": request.difficulty
+    })
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobResponse)
+async def get_generation_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Consultar Job de Geração
+    
+    Retorna o status de um job (`pending`, `running`, `succeeded`, `failed`).
+    Quando concluído, inclui `shopping_list_id` da lista salva e os itens gerados em `result`.
+    
+    **Parâmetros de consulta:**
+    - **wait**: Segundos para aguardar a conclusão antes de responder (long polling, 0 a 30, padrão: 0)
+    
+    **Resposta:**
+    - `200`: Status atual do job
+    - `401`: Token inválido ou expirado
+    - `404`: Job não encontrado
+    """
+    user = await get_current_user(db, credentials.credentials)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id = user.id
+    
+    deadline = time.monotonic() + wait
+    while True:
+        job = await job_queue.get_job(db, job_id, user_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED) or time.monotonic() >= deadline:
+            return job
+        # End the transaction so the connection goes back to the pool while we wait
+        await db.rollback()
+        await asyncio.sleep(0.5)
+
+
 @router.post("/suggestions", response_model=SuggestionResponse)
 async def get_item_suggestions(
     request: SuggestionRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get item suggestions based on user's shopping history"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -433,7 +728,7 @@ async def get_item_suggestions(
             detail="Can only get suggestions for own account"
         )
     
-    suggested_items = shopping_service.get_suggestions_from_history(db, user.id, request.limit)
+    suggested_items = await shopping_service.get_suggestions_from_history(db, user.id, request.limit)
     
     return SuggestionResponse(
         suggested_items=suggested_items,
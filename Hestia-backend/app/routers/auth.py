@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas.auth import Token, LoginRequest
 from ..schemas.user import UserCreate, UserResponse
-from ..services.auth import authenticate_user, create_access_token, get_password_hash, get_current_user
+from ..services.auth import authenticate_user, create_access_token, get_password_hash, get_current_user, get_user_by_email
 from ..models.user import User
 
 router = APIRouter(prefix="/auth", tags=["🔐 Autenticação"])
@@ -12,7 +13,7 @@ security = HTTPBearer()
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     ## Cadastrar Novo Usuário
     
@@ -25,7 +26,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     """
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,7 +34,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     db_user = User(
         name=user_data.name,
         email=user_data.email,
@@ -41,14 +42,14 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
     ## Fazer Login
     
@@ -63,7 +64,7 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     - Copie o `access_token` da resposta
     - Adicione no header: `Authorization: Bearer {token}`
     """
-    user = authenticate_user(db, login_data.email, login_data.password)
+    user = await authenticate_user(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,9 +77,9 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
+async def get_current_user_info(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Obter Dados do Usuário Logado
@@ -89,7 +90,7 @@ def get_current_user_info(
     - Token JWT no header: `Authorization: Bearer {token}`
     
     """
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..schemas.item import ItemUpdate, ItemResponse
 from ..services.auth import get_current_user
@@ -15,10 +15,10 @@ async def update_item(
     item_id: int,
     item_data: ItemUpdate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an item in a shopping list"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,7 +26,7 @@ async def update_item(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    updated_item = shopping_service.update_item(db, item_id, user.id, item_data)
+    updated_item = await shopping_service.update_item(db, item_id, user.id, item_data)
     if not updated_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,10 +40,10 @@ async def update_item(
 async def delete_item(
     item_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an item from a shopping list"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,7 +51,7 @@ async def delete_item(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    success = shopping_service.delete_item(db, item_id, user.id)
+    success = await shopping_service.delete_item(db, item_id, user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -65,10 +65,10 @@ async def delete_item(
 async def toggle_item_purchased(
     item_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Toggle item purchased status"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,7 +76,7 @@ async def toggle_item_purchased(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    updated_item = shopping_service.toggle_item_purchased(db, item_id, user.id)
+    updated_item = await shopping_service.toggle_item_purchased(db, item_id, user.id)
     if not updated_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
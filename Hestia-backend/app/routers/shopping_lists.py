@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from ..database import get_db
 from ..schemas.shopping_list import ShoppingListCreate, ShoppingListUpdate, ShoppingListResponse, ShoppingListWithStats
-from ..schemas.item import ItemCreate
+from ..schemas.item import ItemCreate, ItemResponse
 from ..services.auth import get_current_user
 from ..services.shopping_service import shopping_service
 from ..models.user import User
@@ -17,7 +17,7 @@ security = HTTPBearer()
 async def create_shopping_list(
     shopping_list_data: ShoppingListCreate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Criar Nova Lista de Compras
@@ -47,7 +47,7 @@ async def create_shopping_list(
     - Use o ID retornado para adicionar itens à lista
     - Acesse `/api/v1/shopping-lists/{id}/items` para adicionar produtos
     """
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,30 +60,36 @@ async def create_shopping_list(
 
 @router.get("/", response_model=List[ShoppingListResponse])
 async def get_shopping_lists(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Listar Todas as Listas de Compras
     
-    Retorna todas as listas de compras do usuário logado com paginação.
+    Retorna as listas de compras do usuário logado, das mais recentes para as mais antigas,
+    com paginação por cursor.
     
     **Autenticação necessária:**
     - Token JWT no header: `Authorization: Bearer {token}`
     
     **Parâmetros de consulta:**
-    - **skip**: Quantidade de itens para pular (padrão: 0)
-    - **limit**: Quantidade máxima de itens (padrão: 100, máximo: 100)
+    - **limit**: Quantidade máxima de listas (padrão: 100, máximo: 100)
+    - **cursor**: Cursor da próxima página, recebido no header `X-Next-Cursor` da resposta anterior
+    - **skip**: Obsoleto, use `cursor` (ignorado quando `cursor` é informado)
     
     **Exemplo de uso:**
     ```
-    GET /api/v1/shopping-lists/?skip=0&limit=10
+    GET /api/v1/shopping-lists/?limit=10
+    GET /api/v1/shopping-lists/?limit=10&cursor={X-Next-Cursor}
     ```
     
     **Resposta:**
-    - `200`: Lista de listas de compras
+    - `200`: Lista de listas de compras; o header `X-Next-Cursor` aparece quando há mais páginas
+    - `400`: Cursor inválido
     - `401`: Token inválido ou expirado
     
     **Exemplo de resposta:**
@@ -100,7 +106,7 @@ async def get_shopping_lists(
     ]
     ```
     """
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -108,17 +114,27 @@ async def get_shopping_lists(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return shopping_service.get_user_shopping_lists(db, user.id, skip, limit)
+    try:
+        shopping_lists, next_cursor = await shopping_service.get_user_shopping_lists(db, user.id, skip, limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return shopping_lists
 
 
 @router.get("/{shopping_list_id}", response_model=ShoppingListResponse)
 async def get_shopping_list(
     shopping_list_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific shopping list by ID"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -126,7 +142,7 @@ async def get_shopping_list(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    shopping_list = shopping_service.get_shopping_list(db, shopping_list_id, user.id)
+    shopping_list = await shopping_service.get_shopping_list(db, shopping_list_id, user.id)
     if not shopping_list:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -141,10 +157,10 @@ async def update_shopping_list(
     shopping_list_id: int,
     shopping_list_data: ShoppingListUpdate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a shopping list"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -152,7 +168,7 @@ async def update_shopping_list(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    updated_list = shopping_service.update_shopping_list(db, shopping_list_id, user.id, shopping_list_data)
+    updated_list = await shopping_service.update_shopping_list(db, shopping_list_id, user.id, shopping_list_data)
     if not updated_list:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -166,10 +182,10 @@ async def update_shopping_list(
 async def delete_shopping_list(
     shopping_list_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a shopping list"""
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -177,7 +193,7 @@ async def delete_shopping_list(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    success = shopping_service.delete_shopping_list(db, shopping_list_id, user.id)
+    success = await shopping_service.delete_shopping_list(db, shopping_list_id, user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -192,7 +208,7 @@ async def add_item_to_list(
     shopping_list_id: int,
     item_data: ItemCreate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Adicionar Item à Lista de Compras
@@ -237,9 +253,11 @@ async def add_item_to_list(
     
     **Recursos especiais:**
     - Se o setor não for informado, a IA classificará automaticamente
+    - Quando a classificação precisa da IA, o item é salvo na hora com `sector_pending: true`
+      e o setor aparece na lista assim que a classificação em segundo plano terminar
     - O item será organizado por setor para facilitar as compras
     """
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -247,7 +265,8 @@ async def add_item_to_list(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    item = await shopping_service.add_item_to_list(db, shopping_list_id, user.id, item_data)
+    user_id = user.id
+    item = await shopping_service.add_item_to_list(db, shopping_list_id, user_id, item_data)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -255,4 +274,58 @@ async def add_item_to_list(
         )
     
     # Return updated shopping list
-    return shopping_service.get_shopping_list(db, shopping_list_id, user.id) 
\ No newline at end of file
+    return await shopping_service.get_shopping_list(db, shopping_list_id, user_id) 
+
+
+@router.get("/{shopping_list_id}/items", response_model=List[ItemResponse])
+async def get_list_items(
+    shopping_list_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ## Listar Itens de uma Lista
+    
+    Retorna os itens de uma lista de compras na ordem em que foram adicionados, com paginação por cursor.
+    
+    **Autenticação necessária:**
+    - Token JWT no header: `Authorization: Bearer {token}`
+    
+    **Parâmetros de consulta:**
+    - **limit**: Quantidade máxima de itens (padrão: 100, máximo: 100)
+    - **cursor**: Cursor da próxima página, recebido no header `X-Next-Cursor` da resposta anterior
+    
+    **Resposta:**
+    - `200`: Itens da página; o header `X-Next-Cursor` aparece quando há mais páginas
+    - `400`: Cursor inválido
+    - `401`: Token inválido ou expirado
+    - `404`: Lista não encontrada
+    """
+    user = await get_current_user(db, credentials.credentials)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    try:
+        page = await shopping_service.get_list_items(db, shopping_list_id, user.id, limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shopping list not found"
+        )
+    
+    items, next_cursor = page
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from ..database import get_db
 from ..schemas.user import UserUpdate, UserProfile
@@ -15,7 +15,7 @@ security = HTTPBearer()
 @router.get("/profile", response_model=UserProfile)
 async def get_user_profile(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Obter Perfil Completo do Usuário
@@ -47,7 +47,7 @@ async def get_user_profile(
     }
     ```
     """
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,7 +56,7 @@ async def get_user_profile(
         )
     
     # Get user statistics
-    stats = shopping_service.get_user_stats(db, user.id)
+    stats = await shopping_service.get_user_stats(db, user.id)
     
     return UserProfile(
         id=user.id,
@@ -75,7 +75,7 @@ async def get_user_profile(
 async def update_user_profile(
     user_update: UserUpdate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ## Atualizar Perfil do Usuário
@@ -104,7 +104,7 @@ async def update_user_profile(
     
     **Nota:** Apenas os campos enviados serão atualizados.
     """
-    user = get_current_user(db, credentials.credentials)
+    user = await get_current_user(db, credentials.credentials)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -113,14 +113,14 @@ async def update_user_profile(
         )
     
     # Update user fields
-    for field, value in user_update.dict(exclude_unset=True).items():
+    for field, value in user_update.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Get updated statistics
-    stats = shopping_service.get_user_stats(db, user.id)
+    stats = await shopping_service.get_user_stats(db, user.id)
     
     return UserProfile(
         id=user.id,
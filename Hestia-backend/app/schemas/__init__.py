@@ -2,12 +2,12 @@ from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserProfile
 from .shopping_list import ShoppingListBase, ShoppingListCreate, ShoppingListUpdate, ShoppingListResponse, ShoppingListWithStats
 from .item import ItemBase, ItemCreate, ItemUpdate, ItemResponse, ItemWithSector
 from .auth import Token, TokenData, LoginRequest
-from .ai import ProductClassificationRequest, ProductClassificationResponse, ListGenerationRequest, ListGenerationResponse, SuggestionRequest, SuggestionResponse
+from .ai import ProductClassificationRequest, ProductClassificationResponse, BatchClassificationRequest, BatchClassificationItem, BatchClassificationResponse, ListGenerationRequest, ListGenerationResponse, GenerationJobResponse, SuggestionRequest, SuggestionResponse
 
 __all__ = [
     "UserBase", "UserCreate", "UserUpdate", "UserResponse", "UserProfile",
     "ShoppingListBase", "ShoppingListCreate", "ShoppingListUpdate", "ShoppingListResponse", "ShoppingListWithStats",
     "ItemBase", "ItemCreate", "ItemUpdate", "ItemResponse", "ItemWithSector",
     "Token", "TokenData", "LoginRequest",
-    "ProductClassificationRequest", "ProductClassificationResponse", "ListGenerationRequest", "ListGenerationResponse", "SuggestionRequest", "SuggestionResponse"
+    "ProductClassificationRequest", "ProductClassificationResponse", "BatchClassificationRequest", "BatchClassificationItem", "BatchClassificationResponse", "ListGenerationRequest", "ListGenerationResponse", "GenerationJobResponse", "SuggestionRequest", "SuggestionResponse"
 ] 
\ No newline at end of file
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
+from datetime import datetime
 from ..models.item import SupermarketSector
+from ..models.generation_job import JobKind, JobStatus
 
 
 class ProductClassificationRequest(BaseModel):
@@ -13,6 +15,22 @@ class ProductClassificationResponse(BaseModel):
     confidence: Optional[float] = None
 
 
+class BatchClassificationRequest(BaseModel):
+    product_names: List[str] = Field(..., min_length=1, max_length=200)
+
+
+class BatchClassificationItem(BaseModel):
+    product_name: str
+    sector: Optional[SupermarketSector] = None
+    confidence: Optional[float] = None
+
+
+class BatchClassificationResponse(BaseModel):
+    items: List[BatchClassificationItem]
+    total_items: int
+    classified_items: int
+
+
 class ListGenerationRequest(BaseModel):
     theme: str
     people_count: Optional[int] = 1
@@ -54,6 +72,21 @@ class RecipeIngredientsResponse(BaseModel):
         from_attributes = True
 
 
+class GenerationJobResponse(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    attempts: int
+    shopping_list_id: Optional[int] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class SuggestionResponse(BaseModel):
     suggested_items: List[str]
     based_on_history: bool 
\ No newline at end of file
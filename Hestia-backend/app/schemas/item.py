@@ -26,6 +26,7 @@ class ItemUpdate(BaseModel):
 class ItemResponse(ItemBase):
     id: int
     is_purchased: bool
+    sector_pending: bool = False  # True while the sector is being classified in the background
     shopping_list_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
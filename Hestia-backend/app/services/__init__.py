@@ -1,9 +1,11 @@
 from .auth import verify_password, get_password_hash, authenticate_user, create_access_token, verify_token, get_current_user
 from .ai_service import OllamaService, ollama_service
 from .shopping_service import ShoppingService, shopping_service
+from .job_queue import JobQueue, job_queue
 
 __all__ = [
     "verify_password", "get_password_hash", "authenticate_user", "create_access_token", "verify_token", "get_current_user",
     "OllamaService", "ollama_service",
-    "ShoppingService", "shopping_service"
+    "ShoppingService", "shopping_service",
+    "JobQueue", "job_queue"
 ] 
\ No newline at end of file
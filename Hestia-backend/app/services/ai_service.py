@@ -1,38 +1,410 @@
+import asyncio
 import httpx
 import json
-from typing import Optional, List, Dict
+import re
+import time
+from typing import AsyncIterator, Optional, List, Dict, Set, Tuple
 from ..models.item import SupermarketSector
 from ..config import settings
+from .catalog import CATALOG_RECIPES, CATALOG_THEMES, list_catalog
+from .classification_cache import classification_cache
+from .generation_cache import generation_cache
+from .lexicon import ProductLexicon
+from .list_parser import JsonItemStreamParser, TextListParser, parse_json_list, parse_text_list
+from .normalization import mentioned_people_count, normalize_product_name
+from .ollama_pool import OllamaPool
+from .single_flight import SingleFlight
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .scheduler import InferenceOverloaded, InferenceScheduler, PRIORITY_BACKGROUND, PRIORITY_CLASSIFICATION, PRIORITY_GENERATION
+from .telemetry import (
+    inference_telemetry, OPERATION_CLASSIFY, OPERATION_CLASSIFY_BATCH, OPERATION_EMBED, OPERATION_GENERATE_LIST, OPERATION_RECIPE
+)
+from .vector_index import ProductVectorIndex
+
+
+class InferenceUnavailable(Exception):
+    """Raised when the model gave no answer: backend down, call failed or circuit open"""
+
+# JSON schema passed as Ollama's ``format`` so generations come back as validated items
+ITEM_LIST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "quantity": {"type": "number"},
+                    "unit": {"type": "string"},
+                    "sector": {"type": "string", "enum": [sector.value for sector in SupermarketSector]}
+                },
+                "required": ["name", "quantity", "unit", "sector"]
+            }
+        }
+    },
+    "required": ["items"]
+}
+
+# Maps free-form sector names returned by the model to supermarket sectors
+SECTOR_ALIASES = {
+    # Setores padrão
+    "hortifruti": SupermarketSector.HORTIFRUTI,
+    "mercearia": SupermarketSector.MERCEARIA,
+    "limpeza": SupermarketSector.LIMPEZA,
+    "congelados": SupermarketSector.CONGELADOS,
+    "padaria": SupermarketSector.PADARIA,
+    "bebidas": SupermarketSector.BEBIDAS,
+    "higiene": SupermarketSector.HIGIENE,
+    # Variações comuns
+    "produtos frescos": SupermarketSector.HORTIFRUTI,
+    "frutas e verduras": SupermarketSector.HORTIFRUTI,
+    "legumes": SupermarketSector.HORTIFRUTI,
+    "alimentos secos": SupermarketSector.MERCEARIA,
+    "grãos": SupermarketSector.MERCEARIA,
+    "cereais": SupermarketSector.MERCEARIA,
+    "laticínios": SupermarketSector.MERCEARIA,
+    "carnes": SupermarketSector.MERCEARIA,
+    "pães": SupermarketSector.PADARIA,
+    "doces": SupermarketSector.PADARIA,
+    "sucos": SupermarketSector.BEBIDAS,
+    "refrigerantes": SupermarketSector.BEBIDAS,
+    "cervejas": SupermarketSector.BEBIDAS,
+    "produtos de limpeza": SupermarketSector.LIMPEZA,
+    "higiene pessoal": SupermarketSector.HIGIENE,
+    "congelados": SupermarketSector.CONGELADOS,
+    "sorvetes": SupermarketSector.CONGELADOS
+}
+
+# Generation cache namespaces
+GENERATION_SHOPPING_LIST = "shopping_list"
+GENERATION_RECIPE = "recipe"
+
+# "3: mercearia", "3. mercearia" or "3) mercearia" in batch classification answers
+BATCH_LINE_PATTERN = re.compile(r"^\s*(\d+)\s*[.:)\-]\s*(.+)$")
+
+# Example answers shown in the generation prompts, grouped by sector
+SHOPPING_LIST_EXAMPLE = {
+    "hortifruti": [("tomate", 0.5, "kg"), ("alface", 1, "un"), ("cebola", 0.3, "kg")],
+    "mercearia": [("arroz", 1, "kg"), ("feijão", 0.5, "kg"), ("óleo", 1, "un")],
+    "padaria": [("pão", 4, "un"), ("queijo", 0.2, "kg")],
+    "bebidas": [("refrigerante", 2, "un"), ("cerveja", 4, "un")]
+}
+RECIPE_EXAMPLE = {
+    "hortifruti": [("tomate", 0.5, "kg"), ("cebola", 0.3, "kg"), ("alho", 0.1, "kg")],
+    "mercearia": [("massa de lasanha", 0.5, "kg"), ("queijo ralado", 0.2, "kg"), ("molho de tomate", 1, "un")],
+    "padaria": [("queijo mussarela", 0.3, "kg")]
+}
+
+def scale_items(items: List[Dict], people_count: int) -> List[Dict]:
+    """Scale per-person item quantities to the number of people"""
+    scaled = []
+    for item in items:
+        scaled_item = {key: value for key, value in item.items() if key != "fixed"}
+        if not item.get("fixed"):
+            scaled_item["quantity"] = item["quantity"] * people_count
+        scaled.append(scaled_item)
+    return scaled
+
+
+def build_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_rate_threshold=settings.circuit_failure_rate_threshold,
+        slow_call_rate_threshold=settings.circuit_slow_call_rate_threshold,
+        slow_call_seconds=settings.circuit_slow_call_seconds,
+        window_size=settings.circuit_window_size,
+        min_calls=settings.circuit_min_calls,
+        open_seconds=settings.circuit_open_seconds,
+        half_open_max_calls=settings.circuit_half_open_max_calls
+    )
+
+
+def build_product_lexicon() -> ProductLexicon:
+    """Index the shipped lexicon plus every product and sector name we already know"""
+    lexicon = ProductLexicon()
+    lexicon.load_file()
+    lexicon.add_many(SECTOR_ALIASES.items())
+    for entry in list_catalog.entries():
+        lexicon.add_many((item["name"], SupermarketSector(item["sector"])) for item in entry.items)
+    return lexicon
 
 
 class OllamaService:
     def __init__(self):
-        self.base_url = settings.ollama_url
-        self.model = "llama3.2:1b"  # Using ultra-light model (1.3GB)
+        self.pool = OllamaPool(
+            settings.ollama_backend_urls,
+            settings.ollama_health_check_interval_seconds,
+            settings.ollama_hedge_percentile
+        )
+        self.model = settings.ollama_model  # Defaults to the ultra-light llama3.2:1b (1.3GB)
+        self.embedding_model = settings.ollama_embedding_model
+        self.lexicon = build_product_lexicon()
+        self.embedding_index = ProductVectorIndex(settings.embedding_index_dir, self.embedding_model)
+        self.embedding_model_missing = False
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.catalog_hits = 0
+        self.catalog_misses = 0
+        self._single_flight = SingleFlight()
+        self.scheduler = InferenceScheduler(
+            settings.inference_max_concurrency,
+            settings.inference_max_queue,
+            settings.inference_retry_after_seconds
+        )
+        self.breaker = build_circuit_breaker()
+        # Failing embedding calls (e.g. the model was never pulled) must not open the generation circuit
+        self.embedding_breaker = build_circuit_breaker()
+    
+    async def startup(self) -> None:
+        """Open the pooled HTTP clients, start the backend health checks and map the embedding index"""
+        await self.pool.start()
+        if self.embeddings_enabled:
+            try:
+                self.embedding_index.load()
+            except (OSError, ValueError) as e:
+                print(f"Error loading embedding index: {e}")
+    
+    async def shutdown(self) -> None:
+        """Close the HTTP clients and their pooled connections, saving the embedding index"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self.embeddings_enabled:
+            await self.embedding_index.save()
+        await self.pool.stop()
+    
+    @property
+    def embeddings_enabled(self) -> bool:
+        return settings.embedding_classifier_enabled and self.embedding_index.available and not self.embedding_model_missing
+    
+    async def check_embedding_model(self) -> None:
+        """Turn the embedding classifier off when no backend lists the embedding model in /api/tags"""
+        if not self.embeddings_enabled:
+            return
+        responses = await asyncio.gather(
+            *(backend.client.get("/api/tags", timeout=settings.ollama_connect_timeout) for backend in self.pool.backends),
+            return_exceptions=True
+        )
+        names: Set[str] = set()
+        answered = False
+        for response in responses:
+            if isinstance(response, Exception) or response.status_code != 200:
+                continue
+            try:
+                names.update(model.get("name") for model in response.json().get("models", []))
+            except (ValueError, AttributeError):
+                continue
+            answered = True
+        if not answered:
+            # Backends unreachable: nothing is known yet, keep the classifier on
+            return
+        wanted = {self.embedding_model} if ":" in self.embedding_model else {self.embedding_model, f"{self.embedding_model}:latest"}
+        if names.isdisjoint(wanted):
+            self.embedding_model_missing = True
+            print(f"Embedding model {self.embedding_model} is not pulled on any Ollama backend; embedding classifier disabled")
     
-    async def _make_request(self, prompt: str) -> Optional[str]:
-        """Make request to Ollama API"""
+    async def preload_models(self) -> None:
+        """Load the configured models into memory on every backend.
+        
+        A generate call without a prompt only loads the model, and
+        ``keep_alive`` keeps it resident so the first user call is not cold."""
+        calls = [("/api/generate", {"model": self.model, "keep_alive": settings.ollama_keep_alive})]
+        if self.embeddings_enabled:
+            calls.append(("/api/embed", {"model": self.embedding_model, "input": "", "keep_alive": settings.ollama_keep_alive}))
+        requests = [(backend, path, payload) for backend in self.pool.backends for path, payload in calls]
+        results = await asyncio.gather(
+            *(backend.client.post(path, json=payload) for backend, path, payload in requests),
+            return_exceptions=True
+        )
+        for (backend, _, payload), result in zip(requests, results):
+            if isinstance(result, Exception):
+                print(f"Error preloading {payload['model']} on {backend.url}: {result}")
+            elif result.status_code != 200:
+                print(f"Error preloading {payload['model']} on {backend.url}: HTTP {result.status_code}")
+    
+    async def _make_request(
+        self,
+        prompt: str,
+        priority: int = PRIORITY_GENERATION,
+        deadline: Optional[float] = None,
+        format: Optional[Dict] = None,
+        operation: str = OPERATION_GENERATE_LIST
+    ) -> Optional[str]:
+        """Make request to Ollama API.
+        
+        Identical concurrent requests (same model, prompt, options, priority
+        and deadline) share a single call to Ollama; a short classification
+        never joins a long generation and inherits its deadline. Calls go through the admission scheduler,
+        which raises InferenceOverloaded when the queue is full or the call
+        is not admitted before its deadline. ``format`` is an optional JSON
+        schema the output must follow; ``operation`` tags the call's telemetry."""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": settings.ollama_keep_alive
+        }
+        if format:
+            payload["format"] = format
+        deadline = deadline or settings.generation_deadline_seconds
+        key = (json.dumps(payload, sort_keys=True), priority, deadline)
+        result = await self._single_flight.do(
+            key, lambda: self._scheduled_post("/api/generate", payload, priority, deadline, operation)
+        )
+        return result.get("response", "").strip() if result else None
+    
+    async def _scheduled_post(
+        self,
+        path: str,
+        payload: Dict,
+        priority: int,
+        deadline: float,
+        operation: str,
+        breaker: Optional[CircuitBreaker] = None
+    ) -> Optional[Dict]:
+        """Send one call through a circuit breaker (the generation one by default) and the scheduler.
+        
+        Returns the response body, or None right away while the circuit is
+        open, so callers serve their fallbacks instead of waiting for a dead
+        backend. 4xx answers such as an unknown model say nothing about the
+        backend's health and are not counted as failures."""
+        breaker = breaker or self.breaker
+        if not breaker.allow_request():
+            return None
+        
+        outcome_recorded = False
+        started = time.monotonic()
+        try:
+            async with self.scheduler.slot(priority, deadline):
+                remaining = deadline - (time.monotonic() - started)
+                call_started = time.monotonic()
+                try:
+                    result = await asyncio.wait_for(self._post(path, payload, remaining), remaining)
+                except (asyncio.TimeoutError, httpx.TimeoutException):
+                    breaker.record_failure()
+                    outcome_recorded = True
+                    print(f"Ollama call exceeded its {deadline}s deadline")
+                    return None
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code >= 500:
+                        breaker.record_failure()
+                        outcome_recorded = True
+                    print(f"Error calling Ollama: {e}")
+                    return None
+                except Exception as e:
+                    breaker.record_failure()
+                    outcome_recorded = True
+                    print(f"Error calling Ollama: {e}")
+                    print(f"Full error details: {type(e).__name__}: {str(e)}")
+                    return None
+                call_seconds = time.monotonic() - call_started
+                breaker.record_success(call_seconds)
+                outcome_recorded = True
+                inference_telemetry.record(operation, payload["model"], result, call_started - started, call_seconds)
+                return result
+        finally:
+            if not outcome_recorded:
+                breaker.release()
+    
+    async def _post(self, path: str, payload: Dict, timeout: Optional[float] = None) -> Dict:
+        response = await self.pool.post(path, payload, timeout)
+        return response.json()
+    
+    async def _stream_generate(self, prompt: str, format: Optional[Dict] = None, operation: str = OPERATION_GENERATE_LIST) -> AsyncIterator[str]:
+        """Stream response text chunks from Ollama as they are generated"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Ollama circuit is open")
+        
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": settings.ollama_keep_alive
+        }
+        if format:
+            payload["format"] = format
+        outcome_recorded = False
+        deadline = settings.generation_deadline_seconds
+        queued = time.monotonic()
+        try:
+            async with self.scheduler.slot(PRIORITY_GENERATION, deadline):
+                started = time.monotonic()
+                # The deadline covers the whole stream, not just admission
+                remaining = deadline - (started - queued)
+                try:
+                    async with self.pool.stream("/api/generate", payload, remaining) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if time.monotonic() - queued > deadline:
+                                raise httpx.ReadTimeout(f"Ollama stream exceeded its {deadline}s deadline")
+                            if not line:
+                                continue
+                            if not outcome_recorded:
+                                # Time to first token is the latency signal for streams
+                                self.breaker.record_success(time.monotonic() - started)
+                                outcome_recorded = True
+                            data = json.loads(line)
+                            chunk = data.get("response")
+                            if chunk:
+                                yield chunk
+                            if data.get("done"):
+                                # The final chunk carries the call's timing fields
+                                inference_telemetry.record(operation, self.model, data, started - queued, time.monotonic() - started)
+                                break
+                except (httpx.HTTPError, ValueError):
+                    if not outcome_recorded:
+                        self.breaker.record_failure()
+                        outcome_recorded = True
+                    raise
+        finally:
+            if not outcome_recorded:
+                self.breaker.release()
+    
+    async def _stream_items(self, prompt: str, operation: str) -> AsyncIterator[Dict]:
+        """Yield list items as soon as the model finishes writing each one.
+        
+        The response is already streaming, so errors (including overload)
+        just end the stream and let the caller fall back to predefined items."""
+        structured = settings.ollama_structured_output
+        parser = JsonItemStreamParser() if structured else TextListParser()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    },
-                    timeout=60.0  # Reduced timeout for ultra-light model
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result.get("response", "").strip()
+            async for chunk in self._stream_generate(prompt, self._list_format(), operation):
+                for item in parser.feed(chunk):
+                    yield item
         except Exception as e:
-            print(f"Error calling Ollama: {e}")
-            print(f"Full error details: {type(e).__name__}: {str(e)}")
-            return None
+            print(f"Error streaming from Ollama: {e}")
+        for item in parser.close():
+            yield item
+    
+    def stats(self) -> Dict:
+        """Runtime counters for monitoring"""
+        return {
+            "model": self.model,
+            "pool": self.pool.stats(),
+            "catalog": {"hits": self.catalog_hits, "misses": self.catalog_misses},
+            "embedding_index": {"model": self.embedding_model, "enabled": self.embeddings_enabled, "products": len(self.embedding_index)},
+            "single_flight": self._single_flight.stats(),
+            "scheduler": self.scheduler.stats(),
+            "circuit_breaker": self.breaker.stats(),
+            "embedding_circuit_breaker": self.embedding_breaker.stats()
+        }
     
     async def classify_product(self, product_name: str) -> Optional[SupermarketSector]:
         """Classify product into supermarket sector using AI"""
+        result = await self.classify_product_with_confidence(product_name)
+        return result[0] if result else None
+    
+    async def classify_product_with_confidence(self, product_name: str) -> Optional[Tuple[SupermarketSector, Optional[float]]]:
+        """Classify product, trying the local lexicon, the cache and the embedding index before the LLM.
+        
+        Confidence is only known for lexicon and embedding matches; cached
+        and LLM answers return None."""
+        known = await self._classify_without_llm(product_name)
+        if known:
+            return known
+        
+        nearest = (await self._classify_with_embeddings([product_name]))[0]
+        if nearest:
+            return nearest
+        
         prompt = f"""Classifique o produto '{product_name}' no setor do supermercado.
         
         Setores disponíveis:
@@ -46,124 +418,323 @@ class OllamaService:
         
         Responda apenas com o nome do setor, sem pontuação ou texto adicional."""
         
-        response = await self._make_request(prompt)
+        response = await self._make_request(prompt, PRIORITY_CLASSIFICATION, settings.classify_deadline_seconds, operation=OPERATION_CLASSIFY)
         if not response:
-            return None
+            # Model unavailable: a low-confidence lexicon guess beats no sector
+            return self.lexicon.classify(product_name)
         
         # Clean response and map to enum
-        sector_name = response.lower().strip()
-        sector_mapping = {
-            # Setores padrão
-            "hortifruti": SupermarketSector.HORTIFRUTI,
-            "mercearia": SupermarketSector.MERCEARIA,
-            "limpeza": SupermarketSector.LIMPEZA,
-            "congelados": SupermarketSector.CONGELADOS,
-            "padaria": SupermarketSector.PADARIA,
-            "bebidas": SupermarketSector.BEBIDAS,
-            "higiene": SupermarketSector.HIGIENE,
-            # Variações comuns
-            "produtos frescos": SupermarketSector.HORTIFRUTI,
-            "frutas e verduras": SupermarketSector.HORTIFRUTI,
-            "legumes": SupermarketSector.HORTIFRUTI,
-            "alimentos secos": SupermarketSector.MERCEARIA,
-            "grãos": SupermarketSector.MERCEARIA,
-            "cereais": SupermarketSector.MERCEARIA,
-            "laticínios": SupermarketSector.MERCEARIA,
-            "carnes": SupermarketSector.MERCEARIA,
-            "pães": SupermarketSector.PADARIA,
-            "doces": SupermarketSector.PADARIA,
-            "sucos": SupermarketSector.BEBIDAS,
-            "refrigerantes": SupermarketSector.BEBIDAS,
-            "cervejas": SupermarketSector.BEBIDAS,
-            "produtos de limpeza": SupermarketSector.LIMPEZA,
-            "higiene pessoal": SupermarketSector.HIGIENE,
-            "congelados": SupermarketSector.CONGELADOS,
-            "sorvetes": SupermarketSector.CONGELADOS
-        }
+        sector = self._match_sector(response)
+        if not sector:
+            return None
+        await classification_cache.set(product_name, self.model, sector)
+        return sector, None
+    
+    async def classify_products(self, product_names: List[str], require_model: bool = False) -> List[Optional[Tuple[SupermarketSector, Optional[float]]]]:
+        """Classify many products, sending every unknown name to the LLM in one prompt per batch.
+        
+        Results are returned in the same order as the input names. When the
+        model gives no answer, names it was needed for get a lexicon guess,
+        or with ``require_model`` InferenceUnavailable is raised instead."""
+        results: List[Optional[Tuple[SupermarketSector, Optional[float]]]] = [None] * len(product_names)
+        pending: Dict[str, List[int]] = {}
+        for index, product_name in enumerate(product_names):
+            known = await self._classify_without_llm(product_name)
+            if known:
+                results[index] = known
+            else:
+                key = normalize_product_name(product_name)
+                if key:
+                    pending.setdefault(key, []).append(index)
+        
+        pending_names = [product_names[indexes[0]] for indexes in pending.values()]
+        for (key, indexes), nearest in zip(list(pending.items()), await self._classify_with_embeddings(pending_names)):
+            if nearest:
+                for index in indexes:
+                    results[index] = nearest
+                del pending[key]
         
-        return sector_mapping.get(sector_name)
+        unknown = list(pending.items())
+        batch_size = settings.classification_batch_size
+        for start in range(0, len(unknown), batch_size):
+            batch = unknown[start:start + batch_size]
+            names = [product_names[indexes[0]] for _, indexes in batch]
+            sectors = await self._classify_batch_with_llm(names)
+            if sectors is None:
+                if require_model:
+                    raise InferenceUnavailable("Ollama gave no answer")
+                # Model unavailable: low-confidence lexicon guesses beat no sector
+                for (_, indexes), name in zip(batch, names):
+                    guess = self.lexicon.classify(name)
+                    for index in indexes:
+                        results[index] = guess
+                continue
+            for (_, indexes), name, sector in zip(batch, names, sectors):
+                if not sector:
+                    continue
+                await classification_cache.set(name, self.model, sector)
+                for index in indexes:
+                    results[index] = (sector, None)
+        
+        return results
     
-    async def generate_shopping_list(self, theme: str, people_count: int = 1) -> Optional[List[Dict]]:
-        """Generate shopping list based on theme using AI"""
-        prompt = f"""Lista de compras para {theme} ({people_count} pessoas).
+    async def classify_product_locally(self, product_name: str) -> Optional[SupermarketSector]:
+        """Classify using only the lexicon and the cache, never calling the model"""
+        known = await self._classify_without_llm(product_name)
+        return known[0] if known else None
+    
+    async def _classify_without_llm(self, product_name: str) -> Optional[Tuple[SupermarketSector, Optional[float]]]:
+        """Confident lexicon match or cached classification"""
+        local_match = self.lexicon.classify(product_name)
+        if local_match and local_match[1] >= settings.lexicon_min_confidence:
+            return local_match
+        
+        cached_sector = await classification_cache.get(product_name, self.model)
+        if cached_sector:
+            return cached_sector, None
+        return None
+    
+    async def _classify_with_embeddings(self, product_names: List[str]) -> List[Optional[Tuple[SupermarketSector, Optional[float]]]]:
+        """Vote among the nearest labeled products; one embedding call for all names"""
+        results: List[Optional[Tuple[SupermarketSector, Optional[float]]]] = [None] * len(product_names)
+        if not product_names or not self.embeddings_enabled or not len(self.embedding_index):
+            return results
+        # Indexed products are embedded by normalized name, so queries are too
+        vectors = await self._embed([normalize_product_name(name) for name in product_names], PRIORITY_CLASSIFICATION)
+        if not vectors:
+            return results
+        for index, (product_name, vector) in enumerate(zip(product_names, vectors)):
+            match = self.embedding_index.search(vector, settings.embedding_neighbors)
+            if not match:
+                continue
+            sector, vote_share, similarity = match
+            if similarity >= settings.embedding_min_similarity and vote_share >= settings.embedding_min_vote_share:
+                results[index] = (sector, round(vote_share, 4))
+                await classification_cache.set(product_name, self.model, sector)
+        return results
+    
+    async def _embed(self, texts: List[str], priority: int) -> Optional[List[List[float]]]:
+        """Embed texts with the embedding model; None when Ollama fails"""
+        payload = {"model": self.embedding_model, "input": texts, "keep_alive": settings.ollama_keep_alive}
+        result = await self._scheduled_post(
+            "/api/embed", payload, priority, settings.classify_deadline_seconds, OPERATION_EMBED, self.embedding_breaker
+        )
+        embeddings = result.get("embeddings") if result else None
+        if not embeddings or len(embeddings) != len(texts):
+            return None
+        return embeddings
+    
+    def remember_product(self, product_name: str, sector: SupermarketSector) -> None:
+        """Add a product whose sector a user confirmed to the embedding index, in the background"""
+        if not self.embeddings_enabled:
+            return
+        task = asyncio.get_running_loop().create_task(self._index_products([product_name], [sector]))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def seed_embedding_index(self) -> None:
+        """Embed every lexicon product when the index for this embedding model is still empty"""
+        if not self.embeddings_enabled or len(self.embedding_index):
+            return
+        products = list(self.lexicon.products.items())
+        batch_size = settings.classification_batch_size
+        for start in range(0, len(products), batch_size):
+            batch = products[start:start + batch_size]
+            await self._index_products([name for name, _ in batch], [sector for _, sector in batch], flush=False)
+        await self.embedding_index.save()
+    
+    async def _index_products(self, product_names: List[str], sectors: List[SupermarketSector], flush: bool = True) -> None:
+        names = [normalize_product_name(name) for name in product_names]
+        try:
+            vectors = await self._embed(names, PRIORITY_BACKGROUND)
+        except InferenceOverloaded:
+            return
+        if not vectors:
+            return
+        try:
+            self.embedding_index.add(names, sectors, vectors)
+            if flush and self.embedding_index.unsaved >= settings.embedding_index_flush_every:
+                await self.embedding_index.save()
+        except (OSError, ValueError) as e:
+            print(f"Error updating embedding index: {e}")
+    
+    async def _classify_batch_with_llm(self, product_names: List[str]) -> Optional[List[Optional[SupermarketSector]]]:
+        """Classify a numbered list of products with a single prompt; None when the model gives no answer"""
+        numbered = "\n".join(f"{number}. {name}" for number, name in enumerate(product_names, start=1))
+        prompt = f"""Classifique cada produto abaixo no setor do supermercado.
 
-Use APENAS estes setores:
+Setores disponíveis:
 - hortifruti
-- mercearia  
+- mercearia
 - limpeza
 - congelados
 - padaria
 - bebidas
 - higiene
 
-Formato: setor: produto1 qty unit, produto2 qty unit
-Exemplo:
-hortifruti: tomate 0.5 kg, alface 1 un, cebola 0.3 kg
-mercearia: arroz 1 kg, feijão 0.5 kg, óleo 1 un
-padaria: pão 4 un, queijo 0.2 kg
-bebidas: refrigerante 2 un, cerveja 4 un
+Produtos:
+{numbered}
 
-Responda no mesmo formato com pelo menos 8-12 itens."""
+Responda uma linha por produto, no formato: número: setor
+Exemplo:
+1: hortifruti
+2: mercearia"""
         
-        response = await self._make_request(prompt)
+        # A batch answers one line per product, so its deadline grows with the batch
+        deadline = settings.classify_deadline_seconds + settings.classify_deadline_per_item_seconds * len(product_names)
+        response = await self._make_request(prompt, PRIORITY_CLASSIFICATION, deadline, operation=OPERATION_CLASSIFY_BATCH)
+        if not response:
+            return None
+        
+        sectors: List[Optional[SupermarketSector]] = [None] * len(product_names)
+        
+        for line in response.split("\n"):
+            match = BATCH_LINE_PATTERN.match(line)
+            if not match:
+                continue
+            position = int(match.group(1)) - 1
+            if 0 <= position < len(sectors):
+                sectors[position] = self._match_sector(match.group(2))
+        return sectors
+    
+    def _match_sector(self, text: str) -> Optional[SupermarketSector]:
+        """Map a model answer such as 'Hortifruti.' to a sector"""
+        sector_name = text.lower().strip().strip(".!*'\"` ")
+        sector = SECTOR_ALIASES.get(sector_name)
+        if sector:
+            return sector
+        # Answers like "banana - hortifruti": accept when exactly one sector is mentioned
+        mentioned = [sector for sector in SupermarketSector if sector.value in sector_name]
+        return mentioned[0] if len(mentioned) == 1 else None
+    
+    async def generate_shopping_list(self, theme: str, people_count: int = 1, priority: int = PRIORITY_GENERATION) -> Optional[List[Dict]]:
+        """Generate shopping list based on theme using AI"""
+        # A count stated in the theme wins, so the prompt, catalog and cache all agree
+        people_count = mentioned_people_count(theme) or people_count
+        cached_items = generation_cache.get(GENERATION_SHOPPING_LIST, self.model, theme, people_count)
+        if cached_items:
+            return cached_items
+        
+        catalog_items = self._catalog_items(CATALOG_THEMES, theme, people_count)
+        if catalog_items:
+            return catalog_items
+        
+        prompt = self._shopping_list_prompt(theme, people_count)
+        response = await self._make_request(prompt, priority, format=self._list_format(), operation=OPERATION_GENERATE_LIST)
         if not response:
             # Fallback to predefined lists when AI fails
             return self._get_fallback_list(theme, people_count)
         
-        try:
-            # Try to parse JSON response first
-            data = json.loads(response)
-            return data.get("items", [])
-        except json.JSONDecodeError:
-            # Fallback: parse simple text format
-            parsed_items = self._parse_text_response(response)
-            if parsed_items:
-                return parsed_items
-            # Final fallback
+        items = self._parse_list_response(response)
+        if not items:
             return self._get_fallback_list(theme, people_count)
+        
+        generation_cache.set(GENERATION_SHOPPING_LIST, self.model, theme, people_count, items)
+        return items
+    
+    async def stream_shopping_list(self, theme: str, people_count: int = 1) -> AsyncIterator[Dict]:
+        """Generate shopping list items incrementally, falling back to the predefined list"""
+        people_count = mentioned_people_count(theme) or people_count
+        cached_items = generation_cache.get(GENERATION_SHOPPING_LIST, self.model, theme, people_count)
+        if not cached_items:
+            cached_items = self._catalog_items(CATALOG_THEMES, theme, people_count)
+        if cached_items:
+            for item in cached_items:
+                yield item
+            return
+        
+        items = []
+        async for item in self._stream_items(self._shopping_list_prompt(theme, people_count), OPERATION_GENERATE_LIST):
+            items.append(item)
+            yield item
+        if items:
+            generation_cache.set(GENERATION_SHOPPING_LIST, self.model, theme, people_count, items)
+        else:
+            for item in self._get_fallback_list(theme, people_count):
+                yield item
+    
+    def _shopping_list_prompt(self, theme: str, people_count: int) -> str:
+        return f"""Lista de compras para {theme} ({people_count} pessoas).
+
+Use APENAS estes setores:
+- hortifruti
+- mercearia  
+- limpeza
+- congelados
+- padaria
+- bebidas
+- higiene
+
+{self._format_instructions(SHOPPING_LIST_EXAMPLE)}
+
+Responda no mesmo formato com pelo menos 8-12 itens."""
+    
+    def _catalog_items(self, section: str, subject: str, people_count: int) -> Optional[List[Dict]]:
+        """Scaled items of the catalog entry confidently matching the theme or recipe, if any"""
+        match = list_catalog.match(section, subject)
+        if not match or match[1] < settings.catalog_min_similarity:
+            self.catalog_misses += 1
+            return None
+        self.catalog_hits += 1
+        return scale_items(match[0].items, people_count)
     
     def _get_fallback_list(self, theme: str, people_count: int) -> List[Dict]:
         """Get predefined shopping list when AI fails"""
-        base_lists = {
-            "churrasco": [
-                {"name": "carne bovina", "quantity": people_count * 0.3, "unit": "kg", "sector": "mercearia"},
-                {"name": "pão de alho", "quantity": people_count * 2, "unit": "un", "sector": "padaria"},
-                {"name": "cebola", "quantity": people_count * 1, "unit": "kg", "sector": "hortifruti"},
-                {"name": "tomate", "quantity": people_count * 0.5, "unit": "kg", "sector": "hortifruti"},
-                {"name": "alface", "quantity": 1, "unit": "un", "sector": "hortifruti"},
-                {"name": "arroz", "quantity": people_count * 0.2, "unit": "kg", "sector": "mercearia"},
-                {"name": "feijão", "quantity": people_count * 0.1, "unit": "kg", "sector": "mercearia"},
-                {"name": "cerveja", "quantity": people_count * 2, "unit": "un", "sector": "bebidas"},
-                {"name": "refrigerante", "quantity": people_count * 1, "unit": "un", "sector": "bebidas"},
-            ],
-            "jantar": [
-                {"name": "arroz", "quantity": people_count * 0.15, "unit": "kg", "sector": "mercearia"},
-                {"name": "feijão", "quantity": people_count * 0.1, "unit": "kg", "sector": "mercearia"},
-                {"name": "carne", "quantity": people_count * 0.2, "unit": "kg", "sector": "mercearia"},
-                {"name": "pão", "quantity": people_count * 1, "unit": "un", "sector": "padaria"},
-                {"name": "alface", "quantity": 1, "unit": "un", "sector": "hortifruti"},
-                {"name": "tomate", "quantity": people_count * 0.3, "unit": "kg", "sector": "hortifruti"},
-            ],
-            "café da manhã": [
-                {"name": "pão", "quantity": people_count * 2, "unit": "un", "sector": "padaria"},
-                {"name": "leite", "quantity": people_count * 0.5, "unit": "L", "sector": "mercearia"},
-                {"name": "café", "quantity": people_count * 0.05, "unit": "kg", "sector": "mercearia"},
-                {"name": "manteiga", "quantity": 1, "unit": "un", "sector": "mercearia"},
-                {"name": "queijo", "quantity": people_count * 0.1, "unit": "kg", "sector": "padaria"},
-                {"name": "ovos", "quantity": people_count * 2, "unit": "un", "sector": "mercearia"},
-                {"name": "banana", "quantity": people_count * 1, "unit": "un", "sector": "hortifruti"},
-                {"name": "laranja", "quantity": people_count * 1, "unit": "un", "sector": "hortifruti"},
-                {"name": "aveia", "quantity": people_count * 0.1, "unit": "kg", "sector": "mercearia"},
-                {"name": "mel", "quantity": 1, "unit": "un", "sector": "mercearia"},
-            ]
-        }
-        
         # Return theme-specific list or default dinner list
-        return base_lists.get(theme.lower(), base_lists["jantar"])
+        match = list_catalog.match(CATALOG_THEMES, theme)
+        if match and match[1] >= settings.catalog_min_similarity:
+            entry = match[0]
+        else:
+            entry = list_catalog.get(CATALOG_THEMES, "jantar")
+        return scale_items(entry.items, people_count)
     
-    async def generate_recipe_ingredients(self, recipe_name: str, people_count: int = 1, difficulty: str = "normal") -> Optional[List[Dict]]:
+    async def generate_recipe_ingredients(self, recipe_name: str, people_count: int = 1, difficulty: str = "normal", priority: int = PRIORITY_GENERATION) -> Optional[List[Dict]]:
         """Generate ingredients list for a specific recipe using AI"""
-        prompt = f"""Lista de ingredientes para {recipe_name} ({people_count} pessoas).
+        people_count = mentioned_people_count(recipe_name) or people_count
+        cached_items = generation_cache.get(GENERATION_RECIPE, self.model, recipe_name, people_count, difficulty)
+        if cached_items:
+            return cached_items
+        
+        catalog_items = self._catalog_items(CATALOG_RECIPES, recipe_name, people_count)
+        if catalog_items:
+            return catalog_items
+        
+        prompt = self._recipe_prompt(recipe_name, people_count, difficulty)
+        response = await self._make_request(prompt, priority, format=self._list_format(), operation=OPERATION_RECIPE)
+        if not response:
+            # Fallback to predefined recipe ingredients
+            return self._get_fallback_recipe_ingredients(recipe_name, people_count, difficulty)
+        
+        items = self._parse_list_response(response)
+        if not items:
+            return self._get_fallback_recipe_ingredients(recipe_name, people_count, difficulty)
+        
+        generation_cache.set(GENERATION_RECIPE, self.model, recipe_name, people_count, items, difficulty)
+        return items
+    
+    async def stream_recipe_ingredients(self, recipe_name: str, people_count: int = 1, difficulty: str = "normal") -> AsyncIterator[Dict]:
+        """Generate recipe ingredients incrementally, falling back to the predefined recipe"""
+        people_count = mentioned_people_count(recipe_name) or people_count
+        cached_items = generation_cache.get(GENERATION_RECIPE, self.model, recipe_name, people_count, difficulty)
+        if not cached_items:
+            cached_items = self._catalog_items(CATALOG_RECIPES, recipe_name, people_count)
+        if cached_items:
+            for item in cached_items:
+                yield item
+            return
+        
+        items = []
+        async for item in self._stream_items(self._recipe_prompt(recipe_name, people_count, difficulty), OPERATION_RECIPE):
+            items.append(item)
+            yield item
+        if items:
+            generation_cache.set(GENERATION_RECIPE, self.model, recipe_name, people_count, items, difficulty)
+        else:
+            for item in self._get_fallback_recipe_ingredients(recipe_name, people_count, difficulty):
+                yield item
+    
+    def _recipe_prompt(self, recipe_name: str, people_count: int, difficulty: str) -> str:
+        return f"""Lista de ingredientes para {recipe_name} ({people_count} pessoas).
 
 Dificuldade: {difficulty}
 
@@ -176,169 +747,43 @@ Use APENAS estes setores:
 - bebidas
 - higiene
 
-Formato: setor: ingrediente1 qty unit, ingrediente2 qty unit
-Exemplo:
-hortifruti: tomate 0.5 kg, cebola 0.3 kg, alho 0.1 kg
-mercearia: massa de lasanha 0.5 kg, queijo ralado 0.2 kg, molho de tomate 1 un
-padaria: queijo mussarela 0.3 kg
+{self._format_instructions(RECIPE_EXAMPLE)}
 
 Responda no mesmo formato com todos os ingredientes necessários para {recipe_name}.
 Quantidades devem ser proporcionais ao número de pessoas ({people_count})."""
-
-        response = await self._make_request(prompt)
-        if not response:
-            # Fallback to predefined recipe ingredients
-            return self._get_fallback_recipe_ingredients(recipe_name, people_count, difficulty)
-        
-        try:
-            # Try to parse JSON response first
-            data = json.loads(response)
-            return data.get("ingredients", [])
-        except json.JSONDecodeError:
-            # Fallback: parse simple text format
-            parsed_items = self._parse_text_response(response)
-            if parsed_items:
-                return parsed_items
-            # Final fallback
-            return self._get_fallback_recipe_ingredients(recipe_name, people_count, difficulty)
     
     def _get_fallback_recipe_ingredients(self, recipe_name: str, people_count: int, difficulty: str) -> List[Dict]:
         """Get predefined recipe ingredients when AI fails"""
-        recipe_ingredients = {
-            "lasanha": [
-                {"name": "massa de lasanha", "quantity": people_count * 0.3, "unit": "kg", "sector": "mercearia"},
-                {"name": "carne moída", "quantity": people_count * 0.2, "unit": "kg", "sector": "mercearia"},
-                {"name": "molho de tomate", "quantity": people_count * 0.5, "unit": "L", "sector": "mercearia"},
-                {"name": "cebola", "quantity": people_count * 0.2, "unit": "kg", "sector": "hortifruti"},
-                {"name": "alho", "quantity": people_count * 0.05, "unit": "kg", "sector": "hortifruti"},
-                {"name": "queijo mussarela", "quantity": people_count * 0.2, "unit": "kg", "sector": "padaria"},
-                {"name": "queijo parmesão", "quantity": people_count * 0.1, "unit": "kg", "sector": "padaria"},
-                {"name": "azeite", "quantity": people_count * 0.05, "unit": "L", "sector": "mercearia"},
-                {"name": "sal", "quantity": 1, "unit": "un", "sector": "mercearia"},
-                {"name": "pimenta", "quantity": 1, "unit": "un", "sector": "mercearia"},
-            ],
-            "feijoada": [
-                {"name": "feijão preto", "quantity": people_count * 0.2, "unit": "kg", "sector": "mercearia"},
-                {"name": "carne de porco", "quantity": people_count * 0.3, "unit": "kg", "sector": "mercearia"},
-                {"name": "linguiça", "quantity": people_count * 0.2, "unit": "kg", "sector": "mercearia"},
-                {"name": "cebola", "quantity": people_count * 0.3, "unit": "kg", "sector": "hortifruti"},
-                {"name": "alho", "quantity": people_count * 0.1, "unit": "kg", "sector": "hortifruti"},
-                {"name": "laranja", "quantity": people_count * 1, "unit": "un", "sector": "hortifruti"},
-                {"name": "couve", "quantity": people_count * 0.2, "unit": "kg", "sector": "hortifruti"},
-                {"name": "arroz", "quantity": people_count * 0.15, "unit": "kg", "sector": "mercearia"},
-                {"name": "farofa", "quantity": people_count * 0.1, "unit": "kg", "sector": "mercearia"},
-            ],
-            "strogonoff": [
-                {"name": "frango", "quantity": people_count * 0.25, "unit": "kg", "sector": "mercearia"},
-                {"name": "creme de leite", "quantity": people_count * 0.2, "unit": "L", "sector": "mercearia"},
-                {"name": "champignon", "quantity": people_count * 0.1, "unit": "kg", "sector": "hortifruti"},
-                {"name": "cebola", "quantity": people_count * 0.2, "unit": "kg", "sector": "hortifruti"},
-                {"name": "alho", "quantity": people_count * 0.05, "unit": "kg", "sector": "hortifruti"},
-                {"name": "ketchup", "quantity": people_count * 0.1, "unit": "L", "sector": "mercearia"},
-                {"name": "mostarda", "quantity": people_count * 0.05, "unit": "L", "sector": "mercearia"},
-                {"name": "arroz", "quantity": people_count * 0.15, "unit": "kg", "sector": "mercearia"},
-                {"name": "batata palha", "quantity": people_count * 0.1, "unit": "kg", "sector": "mercearia"},
-            ],
-            "risoto": [
-                {"name": "arroz arbóreo", "quantity": people_count * 0.15, "unit": "kg", "sector": "mercearia"},
-                {"name": "queijo parmesão", "quantity": people_count * 0.1, "unit": "kg", "sector": "padaria"},
-                {"name": "manteiga", "quantity": people_count * 0.05, "unit": "kg", "sector": "mercearia"},
-                {"name": "cebola", "quantity": people_count * 0.2, "unit": "kg", "sector": "hortifruti"},
-                {"name": "alho", "quantity": people_count * 0.05, "unit": "kg", "sector": "hortifruti"},
-                {"name": "caldo de legumes", "quantity": people_count * 0.5, "unit": "L", "sector": "mercearia"},
-                {"name": "vinho branco", "quantity": people_count * 0.1, "unit": "L", "sector": "bebidas"},
-                {"name": "azeite", "quantity": people_count * 0.05, "unit": "L", "sector": "mercearia"},
-            ],
-            "pizza": [
-                {"name": "farinha de trigo", "quantity": people_count * 0.3, "unit": "kg", "sector": "mercearia"},
-                {"name": "fermento biológico", "quantity": people_count * 0.02, "unit": "kg", "sector": "mercearia"},
-                {"name": "azeite", "quantity": people_count * 0.05, "unit": "L", "sector": "mercearia"},
-                {"name": "molho de tomate", "quantity": people_count * 0.3, "unit": "L", "sector": "mercearia"},
-                {"name": "queijo mussarela", "quantity": people_count * 0.3, "unit": "kg", "sector": "padaria"},
-                {"name": "tomate", "quantity": people_count * 0.2, "unit": "kg", "sector": "hortifruti"},
-                {"name": "manjericão", "quantity": people_count * 0.05, "unit": "kg", "sector": "hortifruti"},
-                {"name": "azeitonas", "quantity": people_count * 0.1, "unit": "kg", "sector": "mercearia"},
-            ]
-        }
-        
         # Return recipe-specific ingredients or default
-        return recipe_ingredients.get(recipe_name.lower(), [
-            {"name": "ingredientes para " + recipe_name, "quantity": 1, "unit": "receita", "sector": "mercearia"}
-        ])
+        match = list_catalog.match(CATALOG_RECIPES, recipe_name)
+        if not match or match[1] < settings.catalog_min_similarity:
+            return [
+                {"name": "ingredientes para " + recipe_name, "quantity": 1, "unit": "receita", "sector": "mercearia"}
+            ]
+        return scale_items(match[0].items, people_count)
     
-    def _parse_text_response(self, text: str) -> List[Dict]:
-        """Parse text response when JSON parsing fails"""
-        items = []
-        lines = text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if ':' in line:
-                # Format: "setor: produto1 qty unit, produto2 qty unit"
-                sector_part, products_part = line.split(':', 1)
-                sector = sector_part.strip().lower()
-                # Normalize sector names
-                if sector == "horifruti":
-                    sector = "hortifruti"
-                # Remove extra hyphens and spaces
-                sector = sector.replace("- ", "").replace("-", "").strip()
-                
-                # Parse products
-                products = [p.strip() for p in products_part.split(',')]
-                for product in products:
-                    if product:
-                        # Simple parsing: "produto qty unit"
-                        parts = product.split()
-                        if len(parts) >= 1:
-                            name = parts[0]
-                            quantity = 1.0
-                            unit = "un"
-                            
-                            if len(parts) >= 2:
-                                try:
-                                    quantity = float(parts[1])
-                                except ValueError:
-                                    pass
-                            
-                            if len(parts) >= 3:
-                                unit = parts[2]
-                            
-                            # Validate and normalize data before adding
-                            valid_sectors = ["hortifruti", "mercearia", "limpeza", "congelados", "padaria", "bebidas", "higiene"]
-                            if name and sector and sector in valid_sectors:
-                                # Normalize units
-                                normalized_unit = self._normalize_unit(unit)
-                                
-                                items.append({
-                                    "name": name,
-                                    "quantity": quantity,
-                                    "unit": normalized_unit,
-                                    "sector": sector
-                                })
-        
-        return items
+    def _list_format(self) -> Optional[Dict]:
+        """JSON schema for list generations, when structured output is enabled"""
+        return ITEM_LIST_SCHEMA if settings.ollama_structured_output else None
     
-    def _normalize_unit(self, unit: str) -> str:
-        """Normalize units to standard values"""
-        unit = unit.lower().strip()
-        
-        # Common unit mappings
-        unit_mapping = {
-            # Weight units
-            "kg": "kg", "kilos": "kg", "quilos": "kg", "g": "g", "gramas": "g",
-            # Volume units
-            "l": "L", "litros": "L", "ml": "ml", "mililitros": "ml",
-            # Count units
-            "un": "un", "unidade": "un", "unidades": "un", "pcs": "un", "peças": "un",
-            # Common cooking units
-            "colher": "colher", "colheres": "colher", "xícara": "xícara", "xícaras": "xícara",
-            "copo": "copo", "copos": "copo", "pitada": "pitada", "pitadas": "pitada",
-            # Fallback for unusual units
-            "dente": "un", "dentes": "un", "dica": "un", "dicas": "un", "gosto": "pitada",
-            "em": "un", "lasanha": "kg", "tomate": "L", "trigo": "kg", "50ml": "ml"
-        }
-        
-        return unit_mapping.get(unit, "un")  # Default to "un" if not found
+    def _format_instructions(self, example: Dict[str, List[Tuple[str, float, str]]]) -> str:
+        """Describe the expected answer format, with ``example`` items grouped by sector"""
+        if settings.ollama_structured_output:
+            items = [
+                {"name": name, "quantity": quantity, "unit": unit, "sector": sector}
+                for sector, products in example.items()
+                for name, quantity, unit in products
+            ]
+            return "Formato: JSON com a lista de itens\nExemplo:\n" + json.dumps({"items": items}, ensure_ascii=False)
+        lines = [
+            f"{sector}: " + ", ".join(f"{name} {quantity} {unit}" for name, quantity, unit in products)
+            for sector, products in example.items()
+        ]
+        return "Formato: setor: produto1 qty unit, produto2 qty unit\nExemplo:\n" + "\n".join(lines)
+    
+    def _parse_list_response(self, response: str) -> List[Dict]:
+        """Parse a generated list: structured JSON first, then the line-based text format"""
+        return parse_json_list(response) or parse_text_list(response)
 
 
 # Global instance
@@ -2,7 +2,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from ..models.user import User
 from ..schemas.auth import TokenData
 from ..config import settings
@@ -21,12 +23,17 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    return await db.scalar(select(User).where(User.email == email))
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
-    user = db.query(User).filter(User.email == email).first()
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not await run_in_threadpool(verify_password, password, user.hashed_password):
         return None
     return user
 
@@ -57,11 +64,10 @@ def verify_token(token: str) -> Optional[TokenData]:
         return None
 
 
-def get_current_user(db: Session, token: str) -> Optional[User]:
+async def get_current_user(db: AsyncSession, token: str) -> Optional[User]:
     """Get current user from JWT token"""
     token_data = verify_token(token)
     if token_data is None:
         return None
     
-    user = db.query(User).filter(User.email == token_data.email).first()
-    return user 
\ No newline at end of file
+    return await get_user_by_email(db, token_data.email) 
\ No newline at end of file
@@ -0,0 +1,111 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from ..config import settings
+from .normalization import normalize_theme
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "data" / "catalog.json"
+
+# Catalog sections
+CATALOG_THEMES = "themes"
+CATALOG_RECIPES = "recipes"
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized text, padded so word edges count"""
+    padded = f"  {text} "
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+@dataclass
+class CatalogEntry:
+    name: str
+    items: List[Dict]  # Per-person quantities, as in scale_items
+    aliases: List[str] = field(default_factory=list)
+
+
+class ListCatalog:
+    """Predefined shopping lists and recipes found by fuzzy name matching.
+
+    Every entry name and alias is normalized with ``normalize_theme``, so
+    accents, case and people counts ("churrasco p/ 10") do not matter, and
+    indexed by character trigram. A lookup scores only the names sharing a
+    trigram with the query, using the Dice coefficient of both trigram sets."""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, CatalogEntry]] = defaultdict(dict)
+        self._names: Dict[str, List[Tuple[str, Set[str], CatalogEntry]]] = defaultdict(list)
+        self._index: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+
+    def load_file(self, path: Path = DEFAULT_CATALOG_PATH) -> None:
+        """Load a ``{"themes": {name: {"aliases": [...], "items": [...]}}, "recipes": {...}}`` JSON catalog"""
+        with open(path, encoding="utf-8") as catalog_file:
+            data = json.load(catalog_file)
+        for section, entries in data.items():
+            # Entries with the same name replace earlier ones
+            for name, entry in entries.items():
+                self._entries[section][normalize_theme(name)] = CatalogEntry(
+                    name=name,
+                    items=entry["items"],
+                    aliases=entry.get("aliases", [])
+                )
+            self._rebuild(section)
+
+    def get(self, section: str, name: str) -> Optional[CatalogEntry]:
+        return self._entries[section].get(normalize_theme(name))
+
+    def entries(self) -> Iterator[CatalogEntry]:
+        for section_entries in self._entries.values():
+            yield from section_entries.values()
+
+    def match(self, section: str, text: str) -> Optional[Tuple[CatalogEntry, float]]:
+        """Best entry for a free-form theme or recipe name and its similarity in [0, 1]"""
+        query = normalize_theme(text)
+        if not query:
+            return None
+        query_trigrams = trigrams(query)
+        shared: Dict[int, int] = defaultdict(int)
+        index = self._index[section]
+        for trigram in query_trigrams:
+            for position in index.get(trigram, ()):
+                shared[position] += 1
+        if not shared:
+            return None
+
+        names = self._names[section]
+        best_entry, best_score = None, 0.0
+        for position, count in shared.items():
+            normalized_name, name_trigrams, entry = names[position]
+            score = 1.0 if normalized_name == query else 2 * count / (len(query_trigrams) + len(name_trigrams))
+            if score > best_score:
+                best_entry, best_score = entry, score
+        return best_entry, round(best_score, 4)
+
+    def _rebuild(self, section: str) -> None:
+        names: List[Tuple[str, Set[str], CatalogEntry]] = []
+        index: Dict[str, List[int]] = defaultdict(list)
+        for entry in self._entries[section].values():
+            for name in {normalize_theme(name) for name in [entry.name, *entry.aliases]}:
+                if not name:
+                    continue
+                name_trigrams = trigrams(name)
+                for trigram in name_trigrams:
+                    index[trigram].append(len(names))
+                names.append((name, name_trigrams, entry))
+        self._names[section] = names
+        self._index[section] = index
+
+
+def build_list_catalog() -> ListCatalog:
+    """The shipped catalog, extended or overridden by the file at ``settings.catalog_path``"""
+    catalog = ListCatalog()
+    catalog.load_file()
+    if settings.catalog_path:
+        catalog.load_file(Path(settings.catalog_path))
+    return catalog
+
+
+# Global instance
+list_catalog = build_list_catalog()
@@ -0,0 +1,124 @@
+import enum
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited because the backend is unhealthy"""
+
+
+class CircuitBreaker:
+    """Failure-rate and slow-call circuit breaker.
+
+    While closed, the outcome of the last ``window_size`` calls is tracked;
+    once at least ``min_calls`` were seen and the failure rate or the slow
+    call rate reaches its threshold, the circuit opens and calls are
+    rejected immediately. After ``open_seconds`` it lets up to
+    ``half_open_max_calls`` probe calls through: if they all succeed
+    quickly it closes again, any failure re-opens it."""
+
+    def __init__(
+        self,
+        failure_rate_threshold: float,
+        slow_call_rate_threshold: float,
+        slow_call_seconds: float,
+        window_size: int,
+        min_calls: int,
+        open_seconds: float,
+        half_open_max_calls: int
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitState.CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend; callers must then record its outcome or release it"""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.short_circuited += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._half_open_in_flight = 0
+            self._half_open_successes = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.short_circuited += 1
+                return False
+            self._half_open_in_flight += 1
+        return True
+
+    def record_success(self, elapsed: float) -> None:
+        slow = elapsed >= self.slow_call_seconds
+        if self.state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            if slow:
+                self._open()
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._close()
+            return
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self) -> None:
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+        self._record(failed=True, slow=False)
+
+    def release(self) -> None:
+        """The allowed call never reached the backend (e.g. rejected by admission control)"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        if self.state == CircuitState.OPEN:
+            # A call allowed before the circuit opened finished late
+            return
+        self._outcomes.append((failed, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failure_rate = sum(1 for failed, _ in self._outcomes if failed) / calls
+        slow_call_rate = sum(1 for _, slow in self._outcomes if slow) / calls
+        if failure_rate >= self.failure_rate_threshold or slow_call_rate >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._opened_at = None
+        self._outcomes.clear()
+
+    def stats(self) -> Dict:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state.value,
+            "window_calls": calls,
+            "window_failure_rate": round(sum(1 for failed, _ in self._outcomes if failed) / calls, 4) if calls else None,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited
+        }
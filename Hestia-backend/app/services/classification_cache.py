@@ -0,0 +1,165 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from ..database import SessionLocal
+from ..models.item import SupermarketSector
+from ..models.product_classification import ProductClassification
+from ..config import settings
+from .normalization import normalize_product_name
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ClassificationCache:
+    """Two-tier product classification cache: in-process LRU in front of the
+    ``product_classifications`` table. Keys include the model name, so
+    switching models never serves classifications made by another model."""
+
+    def __init__(self):
+        self._memory = TTLCache(
+            settings.classification_cache_size,
+            settings.classification_cache_ttl_seconds
+        )
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get(self, product_name: str, model: str) -> Optional[SupermarketSector]:
+        """Look up a cached sector, promoting persistent hits into memory"""
+        key = (model, normalize_product_name(product_name))
+        if not key[1]:
+            return None
+
+        sector = self._memory.get(key)
+        if sector is not None:
+            self.memory_hits += 1
+            return sector
+
+        sector = await run_in_threadpool(self._load, *key)
+        if sector is not None:
+            self.persistent_hits += 1
+            self._memory.set(key, sector)
+            return sector
+
+        self.misses += 1
+        return None
+
+    async def set(self, product_name: str, model: str, sector: SupermarketSector) -> None:
+        """Store a classification in both tiers"""
+        key = (model, normalize_product_name(product_name))
+        if not key[1]:
+            return
+        self._memory.set(key, sector)
+        await run_in_threadpool(self._store, *key, sector)
+
+    async def prime(self, model: str) -> int:
+        """Load the most recent persisted classifications into memory; returns how many"""
+        rows = await run_in_threadpool(self._load_recent, model, self._memory.max_size)
+        # Oldest first, so the most recent end up as the most recently used
+        for normalized_name, sector in reversed(rows):
+            self._memory.set((model, normalized_name), sector)
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        hits = self.memory_hits + self.persistent_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "memory_entries": len(self._memory)
+        }
+
+    def _load(self, model: str, normalized_name: str) -> Optional[SupermarketSector]:
+        db = SessionLocal()
+        try:
+            row = db.query(ProductClassification.sector).filter(
+                ProductClassification.model == model,
+                ProductClassification.normalized_name == normalized_name
+            ).first()
+            return row[0] if row else None
+        except SQLAlchemyError as e:
+            print(f"Error reading classification cache: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _load_recent(self, model: str, limit: int) -> List[Tuple[str, SupermarketSector]]:
+        db = SessionLocal()
+        try:
+            return [
+                (row.normalized_name, row.sector)
+                for row in db.query(ProductClassification.normalized_name, ProductClassification.sector).filter(
+                    ProductClassification.model == model
+                ).order_by(ProductClassification.id.desc()).limit(limit)
+            ]
+        except SQLAlchemyError as e:
+            print(f"Error reading classification cache: {e}")
+            return []
+        finally:
+            db.close()
+
+    def _store(self, model: str, normalized_name: str, sector: SupermarketSector) -> None:
+        db = SessionLocal()
+        try:
+            row = db.query(ProductClassification).filter(
+                ProductClassification.model == model,
+                ProductClassification.normalized_name == normalized_name
+            ).first()
+            if row:
+                row.sector = sector
+            else:
+                db.add(ProductClassification(
+                    normalized_name=normalized_name,
+                    model=model,
+                    sector=sector
+                ))
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same product concurrently
+            db.rollback()
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Error writing classification cache: {e}")
+        finally:
+            db.close()
+
+
+# Global instance
+classification_cache = ClassificationCache()
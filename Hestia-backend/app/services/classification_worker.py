@@ -0,0 +1,133 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from ..database import SessionLocal
+from ..models.item import Item, SupermarketSector
+from ..config import settings
+from .ai_service import InferenceUnavailable, ollama_service
+from .scheduler import InferenceOverloaded
+
+
+class ClassificationWorker:
+    """Background classification of items inserted with a pending sector.
+
+    Items are queued right after their insert commits. The worker takes
+    everything queued within ``classification_batch_window_seconds`` (up to
+    one batch) and classifies it with a single ``classify_products`` call,
+    then writes the sectors back. Rows are only updated while still pending,
+    so a sector the user set in the meantime always wins. Pending rows left
+    by a previous process are queued again on start. While the model is
+    saturated or unavailable, and when the sectors cannot be saved, the
+    batch stays pending and is queued again after a pause."""
+
+    def __init__(self):
+        self._queue: "asyncio.Queue[Tuple[int, str]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.classified = 0
+        self.unclassified = 0
+        self.retries = 0
+
+    def submit(self, item_id: int, name: str) -> None:
+        self._queue.put_nowait((item_id, name))
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        try:
+            for item_id, name in await run_in_threadpool(self._load_pending):
+                self.submit(item_id, name)
+        except SQLAlchemyError as e:
+            print(f"Error loading pending classifications: {e}")
+        self._task = asyncio.create_task(self._work())
+
+    async def stop(self) -> None:
+        """Stop the worker; items still queued stay pending and are picked up on the next start"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _work(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                results = await ollama_service.classify_products([name for _, name in batch], require_model=True)
+            except InferenceOverloaded as e:
+                # Model saturated: keep the items pending and try again later
+                await self._retry_later(batch, e.retry_after)
+                continue
+            except InferenceUnavailable:
+                # Model down or circuit open: a missing answer is not "unclassifiable"
+                await self._retry_later(batch)
+                continue
+            except Exception as e:
+                print(f"Error classifying pending items: {e}")
+                await self._retry_later(batch)
+                continue
+
+            sectors = {item_id: result[0] if result else None for (item_id, _), result in zip(batch, results)}
+            try:
+                await run_in_threadpool(self._store, sectors)
+            except SQLAlchemyError as e:
+                print(f"Error saving item sectors, retrying: {e}")
+                await self._retry_later(batch)
+                continue
+            classified = sum(1 for sector in sectors.values() if sector)
+            self.classified += classified
+            self.unclassified += len(sectors) - classified
+
+    async def _retry_later(self, batch: List[Tuple[int, str]], delay: Optional[float] = None) -> None:
+        self.retries += 1
+        await asyncio.sleep(delay or settings.inference_retry_after_seconds)
+        for entry in batch:
+            self.submit(*entry)
+
+    async def _next_batch(self) -> List[Tuple[int, str]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.classification_batch_window_seconds
+        while len(batch) < settings.classification_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _load_pending(self) -> List[Tuple[int, str]]:
+        db = SessionLocal()
+        try:
+            return [(item_id, name) for item_id, name in db.query(Item.id, Item.name).filter(Item.sector_pending.is_(True))]
+        finally:
+            db.close()
+
+    def _store(self, sectors: Dict[int, Optional[SupermarketSector]]) -> None:
+        db = SessionLocal()
+        try:
+            for item_id, sector in sectors.items():
+                # Items the model answered for but could not classify stop being pending, without a sector
+                db.query(Item).filter(Item.id == item_id, Item.sector_pending.is_(True)).update(
+                    {Item.sector: sector, Item.sector_pending: False},
+                    synchronize_session=False
+                )
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "classified": self.classified,
+            "unclassified": self.unclassified,
+            "retries": self.retries
+        }
+
+
+# Global instance
+classification_worker = ClassificationWorker()
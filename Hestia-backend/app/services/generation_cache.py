@@ -0,0 +1,75 @@
+import math
+from typing import Dict, List, Optional, Tuple
+from ..config import settings
+from .classification_cache import TTLCache
+from .normalization import mentioned_people_count, normalize_theme
+
+
+class GenerationCache:
+    """Cache of generated lists stored with per-person quantities.
+
+    "churrasco for 6" and "churrasco for 8" share one entry: quantities
+    are divided by the people count when stored and multiplied by the
+    requested count when served, like the predefined fallback lists. A
+    count stated in the theme itself ("churrasco para 10 pessoas") is
+    dropped from the key and takes precedence over ``people_count``."""
+
+    def __init__(self):
+        self._entries = TTLCache(settings.generation_cache_size, settings.generation_cache_ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, kind: str, model: str, subject: str, difficulty: Optional[str]) -> Optional[Tuple]:
+        normalized = normalize_theme(subject)
+        if not normalized:
+            return None
+        return kind, model, normalized, (difficulty or "").strip().lower()
+
+    def get(self, kind: str, model: str, subject: str, people_count: int, difficulty: Optional[str] = None) -> Optional[List[Dict]]:
+        """Cached items scaled to ``people_count``, or None"""
+        key = self._key(kind, model, subject, difficulty)
+        per_person = self._entries.get(key) if key else None
+        if per_person is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        people_count = mentioned_people_count(subject) or people_count
+        return [self._scale(item, people_count) for item in per_person]
+
+    def set(self, kind: str, model: str, subject: str, people_count: int, items: List[Dict], difficulty: Optional[str] = None) -> None:
+        """Store generated items for ``people_count`` people as per-person quantities"""
+        key = self._key(kind, model, subject, difficulty)
+        if not key or not items:
+            return
+        people_count = max(mentioned_people_count(subject) or people_count or 1, 1)
+        per_person = []
+        for item in items:
+            try:
+                quantity = float(item["quantity"]) / people_count
+            except (KeyError, TypeError, ValueError):
+                continue
+            per_person.append({**item, "quantity": quantity})
+        if per_person:
+            self._entries.set(key, per_person)
+
+    def _scale(self, item: Dict, people_count: int) -> Dict:
+        quantity = item["quantity"] * max(people_count or 1, 1)
+        if item.get("unit") == "un":
+            # Whole units: never ask for 2.4 breads
+            quantity = float(max(1, math.ceil(quantity - 1e-9)))
+        else:
+            quantity = round(quantity, 2)
+        return {**item, "quantity": quantity}
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._entries)
+        }
+
+
+# Global instance
+generation_cache = GenerationCache()
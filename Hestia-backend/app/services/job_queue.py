@@ -0,0 +1,241 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from ..database import SessionLocal
+from ..models.generation_job import GenerationJob, JobKind, JobStatus
+from ..models.item import Item, SupermarketSector
+from ..models.shopping_list import ShoppingList
+from ..config import settings
+from .ai_service import ollama_service
+from .classification_worker import classification_worker
+from .scheduler import PRIORITY_BACKGROUND
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_sector(value) -> Optional[SupermarketSector]:
+    try:
+        return SupermarketSector(value)
+    except ValueError:
+        return None
+
+
+class JobQueue:
+    """Durable queue of AI list generations backed by the ``generation_jobs`` table.
+
+    Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` and hold a
+    lease while calling Ollama. The generated list and the job completion
+    are written in one transaction, and only by the worker that still owns
+    the lease, so a retried or re-claimed job never saves a list twice. Jobs
+    whose worker crashed are picked up again once their lease expires."""
+
+    def __init__(self):
+        self.worker_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._workers: List[asyncio.Task] = []
+
+    async def enqueue(self, db: AsyncSession, user_id: int, kind: JobKind, params: Dict) -> GenerationJob:
+        """Create a pending job"""
+        job = GenerationJob(
+            user_id=user_id,
+            kind=kind,
+            params=params,
+            status=JobStatus.PENDING,
+            max_attempts=settings.job_max_attempts,
+            run_after=_utcnow()
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def get_job(self, db: AsyncSession, job_id: str, user_id: int) -> Optional[GenerationJob]:
+        """Get a job by ID for a user"""
+        return await db.scalar(select(GenerationJob).where(
+            GenerationJob.id == job_id,
+            GenerationJob.user_id == user_id
+        ))
+
+    def start(self) -> None:
+        """Start this process' worker pool"""
+        if self._workers:
+            return
+        for number in range(settings.job_workers):
+            worker_id = f"{self.worker_prefix}-{number}"
+            self._workers.append(asyncio.create_task(self._work(worker_id)))
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs they were running are retried after their lease expires"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self, worker_id: str) -> None:
+        while True:
+            try:
+                job = await run_in_threadpool(self._claim, worker_id)
+            except Exception as e:
+                print(f"Error claiming generation job: {e}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(settings.job_poll_interval_seconds)
+                continue
+
+            try:
+                shopping_list, items = await self._generate(job)
+                pending = await run_in_threadpool(self._complete, job["id"], worker_id, job["user_id"], shopping_list, items)
+                # Submitted only once the list is committed, like ShoppingService.create_shopping_list
+                for item_id, name in pending or []:
+                    classification_worker.submit(item_id, name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error running generation job {job['id']}: {e}")
+                await run_in_threadpool(self._fail, job["id"], worker_id, str(e))
+
+    def _claim(self, worker_id: str) -> Optional[Dict]:
+        """Lease the oldest runnable job: pending and due, or running with an expired lease"""
+        db = SessionLocal()
+        try:
+            while True:
+                now = _utcnow()
+                job = db.query(GenerationJob).filter(
+                    or_(
+                        and_(GenerationJob.status == JobStatus.PENDING, GenerationJob.run_after <= now),
+                        and_(GenerationJob.status == JobStatus.RUNNING, GenerationJob.locked_until < now)
+                    )
+                ).order_by(GenerationJob.created_at).with_for_update(skip_locked=True).first()
+                if not job:
+                    db.rollback()
+                    return None
+
+                if job.attempts >= job.max_attempts:
+                    # A worker died while running the last allowed attempt
+                    job.status = JobStatus.FAILED
+                    job.error = job.error or "Job lease expired on its last attempt"
+                    job.locked_by = None
+                    job.locked_until = None
+                    db.commit()
+                    continue
+
+                job.status = JobStatus.RUNNING
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.locked_until = now + timedelta(seconds=settings.job_lease_seconds)
+                db.commit()
+                return {"id": job.id, "user_id": job.user_id, "kind": job.kind, "params": dict(job.params)}
+        finally:
+            db.close()
+
+    async def _generate(self, job: Dict) -> Tuple[Dict, List[Dict]]:
+        """Call Ollama for the job; returns the list name/description and its items"""
+        params = job["params"]
+        people_count = params.get("people_count") or 1
+        if job["kind"] == JobKind.SHOPPING_LIST:
+            theme = params["theme"]
+            items = await ollama_service.generate_shopping_list(theme, people_count, PRIORITY_BACKGROUND)
+            shopping_list = {
+                "name": f"Lista IA: {theme}",
+                "description": f"Lista gerada automaticamente pela IA para {theme} ({people_count} pessoas)"
+            }
+        else:
+            recipe_name = params["recipe_name"]
+            difficulty = params.get("difficulty") or "normal"
+            items = await ollama_service.generate_recipe_ingredients(recipe_name, people_count, difficulty, PRIORITY_BACKGROUND)
+            shopping_list = {
+                "name": f"Ingredientes: {recipe_name}",
+                "description": f"Lista de ingredientes para {recipe_name} ({people_count} pessoas) - Dificuldade: {difficulty}"
+            }
+        if not items:
+            raise RuntimeError("Failed to generate items")
+
+        unclassified = [item for item in items if not _parse_sector(item.get("sector"))]
+        if unclassified:
+            results = await ollama_service.classify_products([item["name"] for item in unclassified])
+            for item, result in zip(unclassified, results):
+                item["sector"] = result[0].value if result else None
+        return shopping_list, items
+
+    def _complete(
+        self, job_id: str, worker_id: str, user_id: int, shopping_list: Dict, items: List[Dict]
+    ) -> Optional[List[Tuple[int, str]]]:
+        """Save the list and mark the job done in one transaction, if we still own it.
+
+        Items without a sector are saved pending, as in ShoppingService.insert_items;
+        returns their (id, name) pairs for the classification worker, or None
+        when the lease was lost."""
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).with_for_update().first()
+            if not job or job.status != JobStatus.RUNNING or job.locked_by != worker_id:
+                # Lease expired and another worker took over; its result wins
+                db.rollback()
+                return None
+
+            db_shopping_list = ShoppingList(user_id=user_id, **shopping_list)
+            db.add(db_shopping_list)
+            db.flush()
+            db_items = []
+            for item in items:
+                sector = _parse_sector(item.get("sector"))
+                db_items.append(Item(
+                    name=item["name"],
+                    quantity=item["quantity"],
+                    unit=item["unit"],
+                    sector=sector,
+                    sector_pending=sector is None,
+                    shopping_list_id=db_shopping_list.id
+                ))
+            db.add_all(db_items)
+            db.flush()
+
+            job.status = JobStatus.SUCCEEDED
+            job.shopping_list_id = db_shopping_list.id
+            job.result = {"items": items}
+            job.error = None
+            job.locked_by = None
+            job.locked_until = None
+            db.commit()
+            return [(db_item.id, db_item.name) for db_item in db_items if db_item.sector_pending]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _fail(self, job_id: str, worker_id: str, error: str) -> None:
+        """Schedule a retry with exponential backoff, or give up after max attempts"""
+        db = SessionLocal()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.id == job_id).with_for_update().first()
+            if not job or job.status != JobStatus.RUNNING or job.locked_by != worker_id:
+                db.rollback()
+                return
+
+            job.error = error
+            job.locked_by = None
+            job.locked_until = None
+            if job.attempts >= job.max_attempts:
+                job.status = JobStatus.FAILED
+            else:
+                job.status = JobStatus.PENDING
+                backoff = settings.job_retry_backoff_seconds * 2 ** (job.attempts - 1)
+                job.run_after = _utcnow() + timedelta(seconds=backoff)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error recording failure of generation job {job_id}: {e}")
+        finally:
+            db.close()
+
+
+# Global instance
+job_queue = JobQueue()
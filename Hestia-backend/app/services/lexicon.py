@@ -0,0 +1,109 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..models.item import SupermarketSector
+from .normalization import normalize_product_name
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "product_lexicon.json"
+
+# Connectives that carry no sector information ("molho de tomate", "sabão em pó")
+STOPWORDS = {"de", "da", "do", "das", "dos", "com", "sem", "em", "para", "p", "e", "a", "o", "ao", "na", "no"}
+
+# Portuguese plural endings, longest first, and their singular replacement
+PLURAL_SUFFIXES = (
+    ("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"),
+    ("res", "r"), ("zes", "z"), ("ns", "m"), ("s", "")
+)
+
+# The first content word is usually the product ("suco de laranja" is a drink)
+HEAD_WEIGHT = 3.0
+MODIFIER_WEIGHT = 1.0
+UNKNOWN_WEIGHT = 0.5
+
+
+def stem(token: str) -> str:
+    """Reduce a normalized Portuguese token to its singular form"""
+    if len(token) <= 3:
+        return token
+    for suffix, replacement in PLURAL_SUFFIXES:
+        min_root = 3 if suffix == "s" else 1
+        if token.endswith(suffix) and len(token) - len(suffix) >= min_root:
+            return token[:-len(suffix)] + replacement
+    return token
+
+
+def _content_stems(normalized_name: str) -> List[str]:
+    return [
+        stem(token) for token in normalized_name.split()
+        if token not in STOPWORDS and not token.isdigit()
+    ]
+
+
+class ProductLexicon:
+    """Keyword/stem index that classifies common groceries without the LLM.
+
+    Exact phrases (after normalization and stemming) classify with full
+    confidence; otherwise every known word votes for its sectors, weighted
+    towards the head noun, and unknown words dilute the confidence."""
+
+    def __init__(self):
+        self._phrases: Dict[str, SupermarketSector] = {}
+        self._tokens: Dict[str, Dict[SupermarketSector, float]] = defaultdict(lambda: defaultdict(float))
+        # Every indexed name, normalized, with its sector
+        self.products: Dict[str, SupermarketSector] = {}
+
+    def add(self, name: str, sector: SupermarketSector) -> None:
+        """Index a product name under a sector"""
+        normalized_name = normalize_product_name(name)
+        stems = _content_stems(normalized_name)
+        if not stems:
+            return
+        self.products[normalized_name] = sector
+        self._phrases[" ".join(stems)] = sector
+        for token in set(stems):
+            self._tokens[token][sector] += 1.0
+
+    def add_many(self, entries: Iterable[Tuple[str, SupermarketSector]]) -> None:
+        for name, sector in entries:
+            self.add(name, sector)
+
+    def load_file(self, path: Path = DEFAULT_LEXICON_PATH) -> None:
+        """Load a ``{"sector": ["product", ...]}`` JSON lexicon"""
+        with open(path, encoding="utf-8") as lexicon_file:
+            data = json.load(lexicon_file)
+        for sector_name, names in data.items():
+            sector = SupermarketSector(sector_name)
+            for name in names:
+                self.add(name, sector)
+
+    def classify(self, product_name: str) -> Optional[Tuple[SupermarketSector, float]]:
+        """Return the best sector and a confidence in [0, 1], or None"""
+        stems = _content_stems(normalize_product_name(product_name))
+        if not stems:
+            return None
+
+        sector = self._phrases.get(" ".join(stems))
+        if sector:
+            return sector, 1.0
+
+        scores: Dict[SupermarketSector, float] = defaultdict(float)
+        total_weight = 0.0
+        for position, token in enumerate(stems):
+            votes = self._tokens.get(token)
+            if not votes:
+                total_weight += UNKNOWN_WEIGHT
+                continue
+            weight = HEAD_WEIGHT if position == 0 else MODIFIER_WEIGHT
+            total_weight += weight
+            token_total = sum(votes.values())
+            for voted_sector, count in votes.items():
+                scores[voted_sector] += weight * count / token_total
+
+        if not scores:
+            return None
+        best_sector = max(scores, key=scores.get)
+        return best_sector, round(scores[best_sector] / total_weight, 4)
+
+    def __len__(self) -> int:
+        return len(self._phrases)
@@ -0,0 +1,225 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from ..models.item import SupermarketSector
+
+VALID_SECTORS = {sector.value for sector in SupermarketSector}
+
+# Common unit mappings
+UNIT_MAPPING = {
+    # Weight units
+    "kg": "kg", "kilos": "kg", "quilos": "kg", "g": "g", "gramas": "g",
+    # Volume units
+    "l": "L", "litros": "L", "ml": "ml", "mililitros": "ml",
+    # Count units
+    "un": "un", "unidade": "un", "unidades": "un", "pcs": "un", "peças": "un",
+    # Common cooking units
+    "colher": "colher", "colheres": "colher", "xícara": "xícara", "xícaras": "xícara",
+    "copo": "copo", "copos": "copo", "pitada": "pitada", "pitadas": "pitada",
+    # Fallback for unusual units
+    "dente": "un", "dentes": "un", "dica": "un", "dicas": "un", "gosto": "pitada",
+    "em": "un", "lasanha": "kg", "tomate": "L", "trigo": "kg", "50ml": "ml"
+}
+
+# "0.5kg" written without a space between quantity and unit
+QUANTITY_WITH_UNIT = re.compile(r"^(\d+(?:\.\d+)?)([^\d.].*)$")
+
+
+def normalize_unit(unit: str) -> str:
+    """Normalize units to standard values"""
+    return UNIT_MAPPING.get(unit.lower().strip(), "un")  # Default to "un" if not found
+
+
+def normalize_sector(sector: str) -> Optional[str]:
+    """Clean a sector label written by the model; None if it is not a known sector"""
+    sector = sector.strip().lower().strip("*#` ")
+    # Remove extra hyphens and spaces
+    sector = sector.replace("- ", "").replace("-", "").strip()
+    if sector == "horifruti":
+        sector = "hortifruti"
+    return sector if sector in VALID_SECTORS else None
+
+
+def validate_item(raw: Any) -> Optional[Dict]:
+    """Validate one structured item; returns a clean item or None.
+
+    Sectors must be one of SupermarketSector and units are normalized, so
+    downstream code can trust every item it receives."""
+    if not isinstance(raw, dict):
+        return None
+    name = raw.get("name")
+    if not isinstance(name, str) or not name.strip():
+        return None
+    sector = raw.get("sector")
+    sector = normalize_sector(sector) if isinstance(sector, str) else None
+    if not sector:
+        return None
+    try:
+        quantity = float(raw.get("quantity", 1))
+    except (TypeError, ValueError):
+        quantity = 1.0
+    if quantity <= 0:
+        quantity = 1.0
+    unit = raw.get("unit")
+    return {
+        "name": name.strip(),
+        "quantity": quantity,
+        "unit": normalize_unit(unit) if isinstance(unit, str) else "un",
+        "sector": sector
+    }
+
+
+def _parse_quantity(token: str) -> Optional[float]:
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def parse_product(text: str) -> Optional[Tuple[str, float, str]]:
+    """Split "produto qty unit" into name, quantity and normalized unit.
+
+    Everything before the quantity is the product name, so multi-word
+    names such as "carne moída 0.5 kg" are kept whole."""
+    parts = text.strip().strip(".;").split()
+    for position, part in enumerate(parts):
+        quantity = _parse_quantity(part)
+        unit = parts[position + 1] if position + 1 < len(parts) else "un"
+        if quantity is None:
+            match = QUANTITY_WITH_UNIT.match(part)
+            if not match:
+                continue
+            quantity, unit = float(match.group(1)), match.group(2)
+        name = " ".join(parts[:position])
+        if not name:
+            return None
+        return name, quantity, normalize_unit(unit)
+
+    name = " ".join(parts)
+    if not name:
+        return None
+    return name, 1.0, "un"
+
+
+class TextListParser:
+    """Incremental parser for the "setor: produto qty unit, produto qty unit" format.
+
+    Feed it model output in arbitrary chunks; each call returns the items
+    completed by that chunk, so a token stream can be forwarded item by
+    item. Call ``close`` at the end to flush the last item."""
+
+    def __init__(self):
+        self._line = ""
+        self._sector: Optional[str] = None
+        self._sector_seen = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        items: List[Dict] = []
+        for char in chunk:
+            if char == "\n":
+                self._finish_product(items)
+                self._sector = None
+                self._sector_seen = False
+            elif char == ":" and not self._sector_seen:
+                self._sector = normalize_sector(self._line)
+                self._sector_seen = True
+                self._line = ""
+            elif char == "," and self._sector_seen:
+                self._finish_product(items)
+            else:
+                self._line += char
+        return items
+
+    def close(self) -> List[Dict]:
+        items: List[Dict] = []
+        self._finish_product(items)
+        return items
+
+    def _finish_product(self, items: List[Dict]) -> None:
+        text, self._line = self._line, ""
+        if not self._sector:
+            return
+        parsed = parse_product(text)
+        if parsed:
+            name, quantity, unit = parsed
+            items.append({
+                "name": name,
+                "quantity": quantity,
+                "unit": unit,
+                "sector": self._sector
+            })
+
+
+class JsonItemStreamParser:
+    """Incremental parser for structured output such as ``{"items": [{...}, ...]}``.
+
+    It scans the token stream once, tracking only nesting and string
+    state, and decodes each object that is a direct element of an array as
+    soon as its closing brace arrives. Text already scanned is discarded
+    unless it belongs to the object being captured."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._containers: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item_start: Optional[int] = None
+        self._item_depth = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        items: List[Dict] = []
+        self._buffer += chunk
+        buffer = self._buffer
+        for position in range(self._position, len(buffer)):
+            char = buffer[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._item_start is None and self._containers and self._containers[-1] == "[":
+                    self._item_start = position
+                    self._item_depth = len(self._containers)
+                self._containers.append(char)
+            elif char in "}]":
+                if self._containers:
+                    self._containers.pop()
+                if char == "}" and self._item_start is not None and len(self._containers) == self._item_depth:
+                    self._emit(buffer[self._item_start:position + 1], items)
+                    self._item_start = None
+
+        # Keep only the part of the buffer an unfinished item still needs
+        keep_from = self._item_start if self._item_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        if self._item_start is not None:
+            self._item_start = 0
+        self._position = len(self._buffer)
+        return items
+
+    def close(self) -> List[Dict]:
+        return []
+
+    def _emit(self, text: str, items: List[Dict]) -> None:
+        try:
+            item = validate_item(json.loads(text))
+        except ValueError:
+            return
+        if item:
+            items.append(item)
+
+
+def parse_json_list(text: str) -> List[Dict]:
+    """Parse a complete structured response in one go"""
+    return JsonItemStreamParser().feed(text)
+
+
+def parse_text_list(text: str) -> List[Dict]:
+    """Parse a complete text response in one go"""
+    parser = TextListParser()
+    return parser.feed(text) + parser.close()
@@ -0,0 +1,30 @@
+import re
+import unicodedata
+from typing import Optional
+
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_product_name(name: str) -> str:
+    """Normalize a product name for lookups: lowercase, no accents, single spaces"""
+    text = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+# "para 10 pessoas", "8 convidados": the people count is a parameter, not part of the theme.
+# Only a number followed by a people noun counts; "festa de 15 anos" or "pizza 4 queijos" are themes.
+_PEOPLE_COUNT = re.compile(r"\b(?:(?:para|pra|p)\s+)?(\d+)\s*(?:pessoas?|convidados?|adultos?|pax)\b")
+
+
+def normalize_theme(theme: str) -> str:
+    """Normalize a list theme or recipe name, dropping any people count it mentions"""
+    return " ".join(_PEOPLE_COUNT.sub(" ", normalize_product_name(theme)).split())
+
+
+def mentioned_people_count(theme: str) -> Optional[int]:
+    """People count stated in a theme such as "churrasco para 10 pessoas", if any"""
+    match = _PEOPLE_COUNT.search(normalize_product_name(theme))
+    count = int(match.group(1)) if match else 0
+    return count or None
@@ -0,0 +1,238 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+import httpx
+from ..config import settings
+
+# Recent call latencies kept to compute the hedging delay
+LATENCY_WINDOW = 200
+MIN_HEDGE_SAMPLES = 20
+
+# Errors that take a backend out of rotation until its next successful health check
+CONNECTION_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def create_ollama_client(base_url: str) -> httpx.AsyncClient:
+    """Build a pooled client with keep-alive and per-phase timeouts"""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(
+            max_connections=settings.ollama_max_connections,
+            max_keepalive_connections=settings.ollama_max_keepalive_connections,
+            keepalive_expiry=settings.ollama_keepalive_expiry
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.ollama_connect_timeout,
+            read=settings.ollama_read_timeout,
+            write=settings.ollama_write_timeout,
+            pool=settings.ollama_pool_timeout
+        )
+    )
+
+
+def request_timeout(read: Optional[float]):
+    """Client timeouts with the read phase bounded by what is left of a call's deadline"""
+    if read is None:
+        return httpx.USE_CLIENT_DEFAULT
+    return httpx.Timeout(
+        connect=settings.ollama_connect_timeout,
+        read=max(read, 0.001),
+        write=settings.ollama_write_timeout,
+        pool=settings.ollama_pool_timeout
+    )
+
+
+class OllamaBackend:
+    """One Ollama server and its HTTP client"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared client; created lazily when used outside the app lifecycle"""
+        self.open()
+        return self._client
+
+    def open(self) -> None:
+        if self._client is None:
+            self._client = create_ollama_client(self.url)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class OllamaPool:
+    """Routes Ollama calls across several servers.
+
+    Each call goes to the healthy backend with the fewest outstanding
+    requests. A background task probes ``/api/tags`` on every backend, and a
+    backend that refuses connections is taken out of rotation until its next
+    successful probe. When ``hedge_percentile`` is set and more than one
+    backend is healthy, a non-streaming call still unanswered after that
+    percentile of recent latencies is sent to a second backend as well; the
+    first answer wins and the other call is cancelled."""
+
+    def __init__(self, urls: List[str], health_interval: float, hedge_percentile: float = 0.0):
+        self.backends = [OllamaBackend(url) for url in urls]
+        self.health_interval = health_interval
+        self.hedge_percentile = hedge_percentile
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._next = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def start(self) -> None:
+        """Open the clients and start the periodic health checks"""
+        for backend in self.backends:
+            backend.open()
+        if self._health_task is None and self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for backend in self.backends:
+            await backend.close()
+
+    def pick(self, exclude: Optional[OllamaBackend] = None) -> Optional[OllamaBackend]:
+        """Healthy backend with the fewest outstanding requests (all backends if none is healthy)"""
+        candidates = [backend for backend in self.backends if backend is not exclude]
+        healthy = [backend for backend in candidates if backend.healthy]
+        if exclude is not None:
+            # A hedge only makes sense on a backend we believe is up
+            candidates = healthy
+        candidates = healthy or candidates
+        if not candidates:
+            return None
+        # Rotate the starting point so ties do not always land on the first backend
+        self._next = (self._next + 1) % len(candidates)
+        rotated = candidates[self._next:] + candidates[:self._next]
+        return min(rotated, key=lambda backend: backend.outstanding)
+
+    async def post(self, path: str, payload: Dict, timeout: Optional[float] = None) -> httpx.Response:
+        """POST to the least loaded backend, hedging slow calls when enabled.
+
+        ``timeout`` overrides the client's read timeout, so a call with a
+        longer deadline is not cut short by the default."""
+        primary = self.pick()
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._post(primary, path, payload, timeout)
+
+        first = asyncio.create_task(self._post(primary, path, payload, timeout))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            secondary = self.pick(exclude=primary)
+            if secondary is not None:
+                self.hedged += 1
+                pending.add(asyncio.create_task(self._post(secondary, path, payload, timeout)))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @asynccontextmanager
+    async def stream(self, path: str, payload: Dict, timeout: Optional[float] = None) -> AsyncIterator[httpx.Response]:
+        """Open a streaming POST on the least loaded backend"""
+        backend = self.pick()
+        backend.outstanding += 1
+        backend.requests += 1
+        try:
+            async with backend.client.stream("POST", path, json=payload, timeout=request_timeout(timeout)) as response:
+                yield response
+        except CONNECTION_ERRORS:
+            backend.failures += 1
+            backend.healthy = False
+            raise
+        except httpx.HTTPError:
+            backend.failures += 1
+            raise
+        finally:
+            backend.outstanding -= 1
+
+    async def _post(self, backend: OllamaBackend, path: str, payload: Dict, timeout: Optional[float] = None) -> httpx.Response:
+        backend.outstanding += 1
+        backend.requests += 1
+        started = time.monotonic()
+        try:
+            response = await backend.client.post(path, json=payload, timeout=request_timeout(timeout))
+            response.raise_for_status()
+        except CONNECTION_ERRORS:
+            backend.failures += 1
+            backend.healthy = False
+            raise
+        except httpx.HTTPError:
+            backend.failures += 1
+            raise
+        finally:
+            backend.outstanding -= 1
+        self._latencies.append(time.monotonic() - started)
+        return response
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Latency percentile after which a call is hedged; None when hedging does not apply"""
+        if not self.hedge_percentile or len(self._latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        if sum(1 for backend in self.backends if backend.healthy) < 2:
+            return None
+        latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile))
+        return latencies[index]
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self._check(backend) for backend in self.backends))
+            await asyncio.sleep(self.health_interval)
+
+    async def _check(self, backend: OllamaBackend) -> None:
+        try:
+            response = await backend.client.get("/api/tags", timeout=settings.ollama_connect_timeout)
+            healthy = response.status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+        if healthy != backend.healthy:
+            print(f"Ollama backend {backend.url} is now {'healthy' if healthy else 'unhealthy'}")
+        backend.healthy = healthy
+
+    def stats(self) -> Dict:
+        return {
+            "backends": [backend.stats() for backend in self.backends],
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins
+        }
@@ -0,0 +1,55 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(row_id: int) -> str:
+    """Opaque cursor pointing just past the given row"""
+    payload = json.dumps([row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Raises ValueError for cursors this module did not produce"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (row_id,) = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return int(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def keyset_page(
+    db: AsyncSession,
+    statement: Select,
+    model,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    offset: int = 0
+) -> Tuple[List, Optional[str]]:
+    """One page of ``statement`` ordered by id and the cursor for the next page, if any.
+
+    The page starts right after the cursor's row instead of skipping
+    rows with OFFSET, so every page costs the same index range scan and
+    rows inserted meanwhile never shift or repeat entries across pages.
+    Ids are assigned in insertion order, so this is also creation order;
+    keying on created_at instead would compare a bound parameter against
+    the stored timestamp, whose format differs between databases.
+    ``offset`` only serves clients still paging with skip."""
+    if cursor:
+        row_id = decode_cursor(cursor)
+        statement = statement.where(model.id < row_id if descending else model.id > row_id)
+
+    statement = statement.order_by(model.id.desc() if descending else model.id)
+    if offset:
+        statement = statement.offset(offset)
+
+    # One extra row tells whether there is a next page
+    rows = list(await db.scalars(statement.limit(limit + 1)))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
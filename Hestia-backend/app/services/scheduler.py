@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+# Lower values are served first
+PRIORITY_CLASSIFICATION = 0
+PRIORITY_GENERATION = 10
+PRIORITY_BACKGROUND = 20
+
+
+class InferenceOverloaded(Exception):
+    """Raised when a call to the model cannot be admitted in time"""
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: Optional[float] = None):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class QueueFullError(InferenceOverloaded):
+    status_code = 429
+
+
+class DeadlineExceededError(InferenceOverloaded):
+    status_code = 503
+
+
+class InferenceScheduler:
+    """Bounded, priority-aware admission control for model calls.
+
+    At most ``max_concurrency`` calls run at once; the rest wait in a
+    priority queue of at most ``max_queue`` entries, so short
+    classifications overtake long list generations. Callers that cannot be
+    queued, or are not admitted before their deadline, fail fast instead of
+    piling up inside Ollama."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, retry_after: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._active = 0
+        self._queued = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.deadline_exceeded = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: int, timeout: float) -> AsyncIterator[None]:
+        """Hold one of the concurrency slots for the duration of the block"""
+        await self._acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int, timeout: float) -> None:
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError("Inference queue is full, try again later", self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._sequence), waiter])
+        self._queued += 1
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            self.deadline_exceeded += 1
+            raise DeadlineExceededError("Inference deadline exceeded while queued", self.retry_after)
+        self.admitted += 1
+
+    def _abandon(self, waiter: "asyncio.Future[None]") -> None:
+        if waiter.done():
+            # The slot was granted just as we gave up; hand it to the next caller
+            self._release()
+        else:
+            waiter.cancel()
+            self._queued -= 1
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled():
+                continue
+            self._queued -= 1
+            self._active += 1
+            waiter.set_result(None)
+            break
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "deadline_exceeded": self.deadline_exceeded
+        }
@@ -1,155 +1,276 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, desc, insert, select
+from typing import List, Optional, Tuple
 from ..models.user import User
 from ..models.shopping_list import ShoppingList
 from ..models.item import Item, SupermarketSector
 from ..schemas.shopping_list import ShoppingListCreate, ShoppingListUpdate
 from ..schemas.item import ItemCreate, ItemUpdate
+from ..config import settings
 from ..services.ai_service import ollama_service
+from ..services.classification_worker import classification_worker
+from ..services.pagination import keyset_page
+from ..services.scheduler import InferenceOverloaded
 
 
 class ShoppingService:
     @staticmethod
-    async def create_shopping_list(db: Session, user_id: int, shopping_list_data: ShoppingListCreate) -> ShoppingList:
+    async def create_shopping_list(db: AsyncSession, user_id: int, shopping_list_data: ShoppingListCreate) -> ShoppingList:
         """Create a new shopping list for a user"""
         db_shopping_list = ShoppingList(
-            **shopping_list_data.dict(),
-            user_id=user_id
+            **shopping_list_data.model_dump(),
+            user_id=user_id,
+            items=[]
         )
         db.add(db_shopping_list)
-        db.commit()
-        db.refresh(db_shopping_list)
+        await db.commit()
         return db_shopping_list
     
     @staticmethod
-    def get_user_shopping_lists(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[ShoppingList]:
-        """Get all shopping lists for a user"""
-        return db.query(ShoppingList).filter(
+    async def create_shopping_list_with_items(
+        db: AsyncSession,
+        user_id: int,
+        shopping_list_data: ShoppingListCreate,
+        items: List[ItemCreate]
+    ) -> Tuple[ShoppingList, List[int]]:
+        """Create a list and all its items in one transaction; returns the list and the item ids.
+        
+        Items without a sector are classified first, with a single batched
+        call and before touching the database, so a fresh session holds no
+        connection while the model runs. Items still without a sector are
+        saved pending and handed to the background classification worker."""
+        unclassified = [item for item in items if not item.sector]
+        if unclassified:
+            try:
+                results = await ollama_service.classify_products([item.name for item in unclassified])
+            except InferenceOverloaded:
+                # The sector is optional; don't fail the save when the model is saturated
+                results = [None] * len(unclassified)
+            for item, result in zip(unclassified, results):
+                item.sector = result[0] if result else None
+        
+        db_shopping_list = ShoppingList(
+            **shopping_list_data.model_dump(),
+            user_id=user_id
+        )
+        try:
+            db.add(db_shopping_list)
+            await db.flush()
+            item_ids = await ShoppingService.insert_items(db, db_shopping_list.id, items)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        for item_id, item in zip(item_ids, items):
+            if item.sector is None:
+                classification_worker.submit(item_id, item.name)
+        return db_shopping_list, item_ids
+    
+    @staticmethod
+    async def insert_items(db: AsyncSession, shopping_list_id: int, items: List[ItemCreate]) -> List[int]:
+        """Insert items with one multi-row INSERT ... RETURNING, without committing.
+        
+        Items without a sector are marked pending; the caller submits them
+        to the classification worker once the transaction commits."""
+        if not items:
+            return []
+        rows = [
+            {**item.model_dump(), "sector_pending": item.sector is None, "shopping_list_id": shopping_list_id}
+            for item in items
+        ]
+        return list(await db.scalars(
+            insert(Item).returning(Item.id, sort_by_parameter_order=True),
+            rows
+        ))
+    
+    @staticmethod
+    async def get_user_shopping_lists(
+        db: AsyncSession,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ShoppingList], Optional[str]]:
+        """Get a page of a user's shopping lists, newest first, with their items.
+        
+        Returns the lists and the cursor for the next page. ``skip`` is kept
+        for older clients and ignored when a cursor is given; raises
+        ValueError for an invalid cursor."""
+        # Items for the whole page come in one extra query instead of one per list
+        statement = select(ShoppingList).options(
+            selectinload(ShoppingList.items)
+        ).where(
+            ShoppingList.user_id == user_id
+        )
+        return await keyset_page(db, statement, ShoppingList, limit, cursor, descending=True, offset=0 if cursor else skip)
+    
+    @staticmethod
+    async def get_shopping_list(db: AsyncSession, shopping_list_id: int, user_id: int) -> Optional[ShoppingList]:
+        """Get a specific shopping list by ID for a user, with its items"""
+        return await db.scalar(select(ShoppingList).options(
+            selectinload(ShoppingList.items)
+        ).where(
+            ShoppingList.id == shopping_list_id,
             ShoppingList.user_id == user_id
-        ).offset(skip).limit(limit).all()
+        ).execution_options(populate_existing=True))
     
     @staticmethod
-    def get_shopping_list(db: Session, shopping_list_id: int, user_id: int) -> Optional[ShoppingList]:
-        """Get a specific shopping list by ID for a user"""
-        return db.query(ShoppingList).filter(
+    async def get_list_items(
+        db: AsyncSession,
+        shopping_list_id: int,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[Item], Optional[str]]]:
+        """Get a page of a list's items in insertion order and the next cursor, or None if the list is not the user's"""
+        if not await ShoppingService.list_belongs_to_user(db, shopping_list_id, user_id):
+            return None
+        statement = select(Item).where(Item.shopping_list_id == shopping_list_id)
+        return await keyset_page(db, statement, Item, limit, cursor)
+    
+    @staticmethod
+    async def list_belongs_to_user(db: AsyncSession, shopping_list_id: int, user_id: int) -> bool:
+        """Check that a list exists and belongs to the user without loading it"""
+        return await db.scalar(select(ShoppingList.id).where(
             ShoppingList.id == shopping_list_id,
             ShoppingList.user_id == user_id
-        ).first()
+        )) is not None
     
     @staticmethod
-    def update_shopping_list(db: Session, shopping_list_id: int, user_id: int, shopping_list_data: ShoppingListUpdate) -> Optional[ShoppingList]:
+    async def update_shopping_list(db: AsyncSession, shopping_list_id: int, user_id: int, shopping_list_data: ShoppingListUpdate) -> Optional[ShoppingList]:
         """Update a shopping list"""
-        db_shopping_list = ShoppingService.get_shopping_list(db, shopping_list_id, user_id)
+        db_shopping_list = await ShoppingService.get_shopping_list(db, shopping_list_id, user_id)
         if not db_shopping_list:
             return None
         
-        for field, value in shopping_list_data.dict(exclude_unset=True).items():
+        for field, value in shopping_list_data.model_dump(exclude_unset=True).items():
             setattr(db_shopping_list, field, value)
         
-        db.commit()
-        db.refresh(db_shopping_list)
+        await db.commit()
         return db_shopping_list
     
     @staticmethod
-    def delete_shopping_list(db: Session, shopping_list_id: int, user_id: int) -> bool:
+    async def delete_shopping_list(db: AsyncSession, shopping_list_id: int, user_id: int) -> bool:
         """Delete a shopping list"""
-        db_shopping_list = ShoppingService.get_shopping_list(db, shopping_list_id, user_id)
+        # Items are loaded with the list, so the delete cascade needs no lazy load
+        db_shopping_list = await ShoppingService.get_shopping_list(db, shopping_list_id, user_id)
         if not db_shopping_list:
             return False
         
-        db.delete(db_shopping_list)
-        db.commit()
+        await db.delete(db_shopping_list)
+        await db.commit()
         return True
     
     @staticmethod
-    async def add_item_to_list(db: Session, shopping_list_id: int, user_id: int, item_data: ItemCreate) -> Optional[Item]:
+    async def add_item_to_list(db: AsyncSession, shopping_list_id: int, user_id: int, item_data: ItemCreate) -> Optional[Item]:
         """Add an item to a shopping list"""
         # Verify shopping list exists and belongs to user
-        shopping_list = ShoppingService.get_shopping_list(db, shopping_list_id, user_id)
-        if not shopping_list:
+        if not await ShoppingService.list_belongs_to_user(db, shopping_list_id, user_id):
             return None
         
         # If sector is not provided, try to classify with AI
-        if not item_data.sector:
-            item_data.sector = await ollama_service.classify_product(item_data.name)
+        sector_pending = False
+        if item_data.sector:
+            ollama_service.remember_product(item_data.name, item_data.sector)
+        elif settings.deferred_classification:
+            # Only local lookups inline; anything needing the model is classified in the background
+            item_data.sector = await ollama_service.classify_product_locally(item_data.name)
+            sector_pending = item_data.sector is None
+        else:
+            # End the read transaction so no connection is held while the model runs;
+            # a commit, unlike a rollback, leaves the caller's loaded objects usable
+            await db.commit()
+            try:
+                item_data.sector = await ollama_service.classify_product(item_data.name)
+            except InferenceOverloaded:
+                # The sector is optional; don't fail the insert when the model is saturated
+                item_data.sector = None
+            sector_pending = item_data.sector is None
         
         db_item = Item(
-            **item_data.dict(),
+            **item_data.model_dump(),
+            sector_pending=sector_pending,
             shopping_list_id=shopping_list_id
         )
         db.add(db_item)
-        db.commit()
-        db.refresh(db_item)
+        await db.commit()
+        if sector_pending:
+            classification_worker.submit(db_item.id, db_item.name)
         return db_item
     
     @staticmethod
-    def update_item(db: Session, item_id: int, user_id: int, item_data: ItemUpdate) -> Optional[Item]:
+    async def update_item(db: AsyncSession, item_id: int, user_id: int, item_data: ItemUpdate) -> Optional[Item]:
         """Update an item in a shopping list"""
-        db_item = db.query(Item).join(ShoppingList).filter(
+        db_item = await db.scalar(select(Item).join(ShoppingList).where(
             Item.id == item_id,
             ShoppingList.user_id == user_id
-        ).first()
+        ))
         
         if not db_item:
             return None
         
-        for field, value in item_data.dict(exclude_unset=True).items():
+        updates = item_data.model_dump(exclude_unset=True)
+        for field, value in updates.items():
             setattr(db_item, field, value)
+        if updates.get("sector"):
+            # The user's choice wins over a pending background classification
+            db_item.sector_pending = False
         
-        db.commit()
-        db.refresh(db_item)
+        await db.commit()
+        if updates.get("sector"):
+            # A sector set by the user is a confirmed label for the embedding classifier
+            ollama_service.remember_product(db_item.name, db_item.sector)
         return db_item
     
     @staticmethod
-    def delete_item(db: Session, item_id: int, user_id: int) -> bool:
+    async def delete_item(db: AsyncSession, item_id: int, user_id: int) -> bool:
         """Delete an item from a shopping list"""
-        db_item = db.query(Item).join(ShoppingList).filter(
+        db_item = await db.scalar(select(Item).join(ShoppingList).where(
             Item.id == item_id,
             ShoppingList.user_id == user_id
-        ).first()
+        ))
         
         if not db_item:
             return False
         
-        db.delete(db_item)
-        db.commit()
+        await db.delete(db_item)
+        await db.commit()
         return True
     
     @staticmethod
-    def toggle_item_purchased(db: Session, item_id: int, user_id: int) -> Optional[Item]:
+    async def toggle_item_purchased(db: AsyncSession, item_id: int, user_id: int) -> Optional[Item]:
         """Toggle item purchased status"""
-        db_item = db.query(Item).join(ShoppingList).filter(
+        db_item = await db.scalar(select(Item).join(ShoppingList).where(
             Item.id == item_id,
             ShoppingList.user_id == user_id
-        ).first()
+        ))
         
         if not db_item:
             return None
         
         db_item.is_purchased = not db_item.is_purchased
-        db.commit()
-        db.refresh(db_item)
+        await db.commit()
         return db_item
     
     @staticmethod
-    def get_user_stats(db: Session, user_id: int) -> dict:
+    async def get_user_stats(db: AsyncSession, user_id: int) -> dict:
         """Get user shopping statistics"""
-        total_lists = db.query(func.count(ShoppingList.id)).filter(
+        total_lists = await db.scalar(select(func.count(ShoppingList.id)).where(
             ShoppingList.user_id == user_id
-        ).scalar()
+        ))
         
-        total_items = db.query(func.count(Item.id)).join(ShoppingList).filter(
+        total_items = await db.scalar(select(func.count(Item.id)).join(ShoppingList).where(
             ShoppingList.user_id == user_id
-        ).scalar()
+        ))
         
         # Get favorite sector
-        favorite_sector = db.query(
+        favorite_sector = (await db.execute(select(
             Item.sector,
             func.count(Item.id).label('count')
-        ).join(ShoppingList).filter(
+        ).join(ShoppingList).where(
             ShoppingList.user_id == user_id
-        ).group_by(Item.sector).order_by(desc('count')).first()
+        ).group_by(Item.sector).order_by(desc('count')))).first()
         
         return {
             "total_lists": total_lists or 0,
@@ -158,16 +279,15 @@ class ShoppingService:
         }
     
     @staticmethod
-    def get_suggestions_from_history(db: Session, user_id: int, limit: int = 10) -> List[str]:
+    async def get_suggestions_from_history(db: AsyncSession, user_id: int, limit: int = 10) -> List[str]:
         """Get item suggestions based on user's shopping history"""
-        items = db.query(Item.name).join(ShoppingList).filter(
+        items = await db.scalars(select(Item.name).join(ShoppingList).where(
             ShoppingList.user_id == user_id
         ).group_by(Item.name).order_by(
             func.count(Item.id).desc()
-        ).limit(limit).all()
+        ).limit(limit))
         
-        return [item[0] for item in items]
-
+        return list(items)
 
 # Global instance
 shopping_service = ShoppingService() 
\ No newline at end of file
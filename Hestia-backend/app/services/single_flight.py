@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight call.
+
+    The first caller starts the work; callers arriving while it runs await
+    the same result. The shared task is shielded, so a waiter that is
+    cancelled (e.g. client disconnect) never cancels it for the others."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the exception so an abandoned failed call is not reported as unhandled
+        if not call.cancelled():
+            call.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls)
+        }
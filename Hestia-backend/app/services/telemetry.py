@@ -0,0 +1,88 @@
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from ..metrics import Histogram
+
+# Operations that call the model
+OPERATION_CLASSIFY = "classify"
+OPERATION_CLASSIFY_BATCH = "classify-batch"
+OPERATION_GENERATE_LIST = "generate-list"
+OPERATION_RECIPE = "recipe"
+OPERATION_EMBED = "embed"
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKENS_PER_SECOND_BUCKETS = (1, 5, 10, 20, 40, 80, 160, 320)
+TOKEN_COUNT_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+
+# Histograms kept per operation and model, with their buckets
+METRICS = {
+    "queue_seconds": SECONDS_BUCKETS,  # Waiting for an admission slot
+    "call_seconds": SECONDS_BUCKETS,  # HTTP call as seen by the API
+    "total_seconds": SECONDS_BUCKETS,  # Ollama total_duration
+    "load_seconds": SECONDS_BUCKETS,  # Ollama load_duration (model load)
+    "prompt_eval_seconds": SECONDS_BUCKETS,
+    "eval_seconds": SECONDS_BUCKETS,
+    "prompt_tokens": TOKEN_COUNT_BUCKETS,
+    "eval_tokens": TOKEN_COUNT_BUCKETS,
+    "tokens_per_second": TOKENS_PER_SECOND_BUCKETS
+}
+
+
+class InferenceTelemetry:
+    """Aggregates the timing fields Ollama returns with every call.
+
+    Durations reported by Ollama are in nanoseconds; comparing them with
+    the time spent queued and the wall-clock call time tells whether a slow
+    call was waiting for a slot, loading the model, reading a long prompt or
+    generating."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Dict[str, Histogram]] = {}
+        self.calls: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def record(self, operation: str, model: str, result: Dict, queue_seconds: float, call_seconds: float) -> None:
+        """Record one finished call from its final response body"""
+        key = (operation, model)
+        histograms = self._histograms.get(key)
+        if histograms is None:
+            histograms = {name: Histogram(buckets) for name, buckets in METRICS.items()}
+            self._histograms[key] = histograms
+        self.calls[key] += 1
+
+        histograms["queue_seconds"].observe(queue_seconds)
+        histograms["call_seconds"].observe(call_seconds)
+        for field, name in (
+            ("total_duration", "total_seconds"),
+            ("load_duration", "load_seconds"),
+            ("prompt_eval_duration", "prompt_eval_seconds"),
+            ("eval_duration", "eval_seconds")
+        ):
+            nanoseconds = _number(result.get(field))
+            if nanoseconds is not None:
+                histograms[name].observe(nanoseconds / 1e9)
+        prompt_tokens = _number(result.get("prompt_eval_count"))
+        if prompt_tokens is not None:
+            histograms["prompt_tokens"].observe(prompt_tokens)
+        eval_tokens = _number(result.get("eval_count"))
+        eval_duration = _number(result.get("eval_duration"))
+        if eval_tokens is not None:
+            histograms["eval_tokens"].observe(eval_tokens)
+            if eval_duration:
+                histograms["tokens_per_second"].observe(eval_tokens / (eval_duration / 1e9))
+
+    def stats(self) -> Dict:
+        stats: Dict[str, Dict] = defaultdict(dict)
+        for (operation, model), histograms in self._histograms.items():
+            stats[operation][model] = {
+                "calls": self.calls[(operation, model)],
+                **{name: histogram.snapshot() for name, histogram in histograms.items() if histogram.count}
+            }
+        return dict(stats)
+
+
+def _number(value) -> Optional[float]:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+# Global instance
+inference_telemetry = InferenceTelemetry()
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from starlette.concurrency import run_in_threadpool
+from ..models.item import SupermarketSector
+
+try:
+    import numpy as np
+except ImportError:  # The embedding classifier is disabled without NumPy
+    np = None
+
+
+class ProductVectorIndex:
+    """Labeled product embeddings searched by cosine similarity.
+
+    Vectors are stored L2-normalized in ``<name>.npy`` next to a
+    ``<name>.labels.json`` file with the product name and sector of each
+    row. On load the matrix is memory-mapped, so workers share the pages
+    and start without reading the whole file. New rows are appended in
+    memory and written back by ``save``, which replaces both files
+    atomically and re-maps the matrix."""
+
+    def __init__(self, directory: str, name: str):
+        safe_name = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")
+        directory_path = Path(directory)
+        self.vectors_path = directory_path / f"{safe_name}.npy"
+        self.labels_path = directory_path / f"{safe_name}.labels.json"
+        self._vectors = None
+        self._names: List[str] = []
+        self._sectors: List[SupermarketSector] = []
+        self._positions: Dict[str, int] = {}
+        self.unsaved = 0
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self) -> int:
+        """Memory-map a previously saved index; returns the number of rows"""
+        if not self.available or not self.vectors_path.exists() or not self.labels_path.exists():
+            return 0
+        vectors = np.load(self.vectors_path, mmap_mode="r")
+        with self.labels_path.open(encoding="utf-8") as labels_file:
+            labels = json.load(labels_file)
+        if len(labels) != len(vectors):
+            print(f"Ignoring embedding index {self.vectors_path}: {len(vectors)} vectors but {len(labels)} labels")
+            return 0
+        self._vectors = vectors
+        self._names = [name for name, _ in labels]
+        self._sectors = [SupermarketSector(sector) for _, sector in labels]
+        self._positions = {name: position for position, name in enumerate(self._names)}
+        return len(self._names)
+
+    def add(self, names: Sequence[str], sectors: Sequence[SupermarketSector], vectors: Sequence[Sequence[float]]) -> None:
+        """Add or relabel normalized product names with their embeddings"""
+        new_names: List[str] = []
+        new_sectors: List[SupermarketSector] = []
+        new_rows = []
+        for name, sector, vector in zip(names, sectors, vectors):
+            position = self._positions.get(name)
+            if position is not None:
+                # Already indexed: a confirmed sector overrides the old label
+                if position < len(self._sectors) and self._sectors[position] != sector:
+                    self._sectors[position] = sector
+                    self.unsaved += 1
+                continue
+            self._positions[name] = len(self._names) + len(new_names)
+            new_names.append(name)
+            new_sectors.append(sector)
+            new_rows.append(vector)
+        if not new_rows:
+            return
+
+        rows = self._normalize(np.asarray(new_rows, dtype=np.float32))
+        if self._vectors is None or not len(self._vectors):
+            self._vectors = rows
+        elif rows.shape[1] != self._vectors.shape[1]:
+            for name in new_names:
+                del self._positions[name]
+            raise ValueError(f"Embedding dimension {rows.shape[1]} does not match index dimension {self._vectors.shape[1]}")
+        else:
+            self._vectors = np.concatenate([self._vectors, rows])
+        self._names.extend(new_names)
+        self._sectors.extend(new_sectors)
+        self.unsaved += len(new_names)
+
+    def search(self, vector: Sequence[float], neighbors: int) -> Optional[Tuple[SupermarketSector, float, float]]:
+        """Vote among the nearest neighbours.
+
+        Returns the winning sector, its similarity-weighted share of the
+        vote and the similarity of the closest product, or None when empty."""
+        if self._vectors is None or not len(self._names):
+            return None
+        query = self._normalize(np.asarray([vector], dtype=np.float32))[0]
+        if query.shape[0] != self._vectors.shape[1]:
+            return None
+        similarities = self._vectors @ query
+        count = min(neighbors, len(similarities))
+        nearest = np.argpartition(-similarities, count - 1)[:count]
+
+        votes: Dict[SupermarketSector, float] = defaultdict(float)
+        for position in nearest:
+            votes[self._sectors[position]] += max(float(similarities[position]), 0.0)
+        total = sum(votes.values())
+        if total <= 0:
+            return None
+        sector = max(votes, key=votes.get)
+        return sector, votes[sector] / total, float(similarities[nearest].max())
+
+    async def save(self) -> None:
+        """Write the index to disk in a worker thread, then re-map it"""
+        if self._vectors is None or not self.unsaved:
+            return
+        # add() replaces the matrix instead of mutating it, so this snapshot stays consistent
+        vectors, unsaved = self._vectors, self.unsaved
+        labels = [[name, sector.value] for name, sector in zip(self._names, self._sectors)]
+        await run_in_threadpool(self._write, vectors, labels)
+        self.unsaved -= unsaved
+        if len(self._names) == len(labels):
+            self._vectors = np.load(self.vectors_path, mmap_mode="r")
+
+    def _write(self, vectors, labels: List[List[str]]) -> None:
+        self.vectors_path.parent.mkdir(parents=True, exist_ok=True)
+        vectors_tmp = self.vectors_path.with_suffix(".tmp.npy")
+        labels_tmp = self.labels_path.with_suffix(".tmp")
+        np.save(vectors_tmp, np.ascontiguousarray(vectors))
+        with labels_tmp.open("w", encoding="utf-8") as labels_file:
+            json.dump(labels, labels_file, ensure_ascii=False)
+        os.replace(vectors_tmp, self.vectors_path)
+        os.replace(labels_tmp, self.labels_path)
+
+    @staticmethod
+    def _normalize(rows):
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return rows / norms
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from ..database import warm_up_async_connections, warm_up_connections
+from ..config import settings
+from .ai_service import ollama_service
+from .classification_cache import classification_cache
+
+
+class Warmup:
+    """Startup phase that loads the models, opens DB connections and primes caches.
+
+    Runs in the background so the server starts accepting connections right
+    away; ``ready`` stays False until every step finished, which /health
+    reports so the load balancer keeps traffic away from a cold worker. A
+    failing step is logged and does not block readiness: a cold but working
+    instance beats one that never becomes ready."""
+
+    def __init__(self):
+        self.ready = False
+        self.errors: List[str] = []
+        self.duration_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if not settings.warmup_enabled:
+            self.ready = True
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self) -> None:
+        started = time.monotonic()
+        await asyncio.gather(
+            self._step("models", self._models()),
+            self._step("database", self._database()),
+            self._step("classification_cache", classification_cache.prime(ollama_service.model))
+        )
+        self.duration_seconds = round(time.monotonic() - started, 3)
+        self.ready = True
+
+    async def _models(self) -> None:
+        await ollama_service.check_embedding_model()
+        await ollama_service.preload_models()
+        await ollama_service.seed_embedding_index()
+
+    async def _database(self) -> None:
+        # Request handlers use the async pool; background workers the sync one
+        await warm_up_async_connections(settings.warmup_db_connections)
+        await run_in_threadpool(warm_up_connections, settings.warmup_db_connections)
+
+    async def _step(self, name: str, step) -> None:
+        try:
+            await step
+        except Exception as e:
+            self.errors.append(f"{name}: {e}")
+            print(f"Error warming up {name}: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "duration_seconds": self.duration_seconds,
+            "errors": self.errors
+        }
+
+
+# Global instance
+warmup = Warmup()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Simulador do Ollama para testes e benchmarks
+
+Implementa /api/generate (com e sem streaming), /api/embed, /api/embeddings e
+/api/tags com latência, velocidade de geração, taxa de erro e respostas
+configuráveis, de forma determinística e sem baixar nenhum modelo.
+
+Uso:
+    python scripts/ollama_simulator.py --port 11434 --latency-ms 200 --tokens-per-second 40
+    OLLAMA_URL=http://localhost:11434 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SECTORS = ["hortifruti", "mercearia", "limpeza", "congelados", "padaria", "bebidas", "higiene"]
+
+# Products used to build generated lists: sector -> (name, quantity per person, unit)
+PRODUCTS = {
+    "hortifruti": [("tomate", 0.2, "kg"), ("cebola", 0.1, "kg"), ("alface", 1, "un"), ("batata", 0.2, "kg"), ("alho", 0.02, "kg")],
+    "mercearia": [("arroz", 0.15, "kg"), ("feijão", 0.1, "kg"), ("azeite", 0.05, "L"), ("carne moída", 0.2, "kg"), ("sal", 1, "un")],
+    "limpeza": [("detergente", 1, "un"), ("esponja", 1, "un")],
+    "congelados": [("sorvete", 0.2, "L"), ("pão de queijo congelado", 0.1, "kg")],
+    "padaria": [("pão francês", 2, "un"), ("queijo mussarela", 0.1, "kg")],
+    "bebidas": [("refrigerante", 0.5, "L"), ("suco de laranja", 0.3, "L"), ("cerveja", 2, "un")],
+    "higiene": [("papel higiênico", 1, "un"), ("sabonete", 1, "un")]
+}
+
+# Words that give a product's sector away in classification prompts
+SECTOR_KEYWORDS = {
+    "hortifruti": ["tomate", "alface", "cebola", "batata", "fruta", "banana", "maçã", "legume", "verdura"],
+    "limpeza": ["detergente", "sabão", "desinfetante", "água sanitária", "esponja", "amaciante"],
+    "congelados": ["congelad", "sorvete", "pizza", "nuggets", "hambúrguer"],
+    "padaria": ["pão", "bolo", "queijo", "presunto", "biscoito"],
+    "bebidas": ["refrigerante", "suco", "cerveja", "vinho", "água", "café"],
+    "higiene": ["shampoo", "sabonete", "creme dental", "papel higiênico", "desodorante", "escova"]
+}
+
+PEOPLE_COUNT = re.compile(r"\((\d+) pessoas\)")
+SUBJECT = re.compile(r"para (.+?) \(\d+ pessoas\)")
+CLASSIFY_PRODUCT = re.compile(r"Classifique o produto '(.+?)'")
+NUMBERED_PRODUCT = re.compile(r"^\s*(\d+)\. (.+)$", re.MULTILINE)
+TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+class Simulator:
+    """Synthetic model: answers depend only on the request and the seed"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.canned = self._load_responses(args.responses)
+        self.requests = 0
+        self.errors = 0
+
+    def _load_responses(self, path: Optional[str]) -> List[Dict]:
+        """``[{"match": "regex", "response": "texto com {subject} e {people_count}"}]``"""
+        if not path:
+            return []
+        with open(path, encoding="utf-8") as responses_file:
+            entries = json.load(responses_file)
+        return [{"pattern": re.compile(entry["match"], re.IGNORECASE), "response": entry["response"]} for entry in entries]
+
+    def latency(self) -> float:
+        """Time to first token, in seconds, drawn from the configured distribution"""
+        mean = self.args.latency_ms / 1000
+        if mean <= 0:
+            return 0.0
+        if self.args.latency_distribution == "exponential":
+            return self.random.expovariate(1 / mean)
+        if self.args.latency_distribution == "lognormal":
+            sigma = self.args.latency_sigma
+            return self.random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+
+    def should_fail(self) -> bool:
+        self.requests += 1
+        if self.random.random() < self.args.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    def respond(self, prompt: str, structured: bool) -> str:
+        """Canned response when one matches, otherwise a synthetic answer shaped like the prompt"""
+        variables = {
+            "prompt": prompt,
+            "people_count": int(PEOPLE_COUNT.search(prompt).group(1)) if PEOPLE_COUNT.search(prompt) else 1,
+            "subject": SUBJECT.search(prompt).group(1) if SUBJECT.search(prompt) else ""
+        }
+        for entry in self.canned:
+            if entry["pattern"].search(prompt):
+                return entry["response"].format_map(variables)
+
+        product = CLASSIFY_PRODUCT.search(prompt)
+        if product:
+            return classify(product.group(1))
+        if "número: setor" in prompt:
+            return "\n".join(f"{number}: {classify(name)}" for number, name in NUMBERED_PRODUCT.findall(prompt))
+        return generate_list(prompt, variables["people_count"], structured)
+
+
+def classify(product_name: str) -> str:
+    name = product_name.lower()
+    for sector, keywords in SECTOR_KEYWORDS.items():
+        if any(keyword in name for keyword in keywords):
+            return sector
+    return "mercearia"
+
+
+def generate_list(prompt: str, people_count: int, structured: bool) -> str:
+    """Pick 8-12 products deterministically from the prompt"""
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    rng = random.Random(seed)
+    catalog = [(sector, product) for sector, products in PRODUCTS.items() for product in products]
+    chosen = rng.sample(catalog, rng.randint(8, 12))
+    items = [
+        {"name": name, "quantity": round(quantity * people_count, 2), "unit": unit, "sector": sector}
+        for sector, (name, quantity, unit) in chosen
+    ]
+    if structured:
+        return json.dumps({"items": items}, ensure_ascii=False)
+    by_sector: Dict[str, List[str]] = {}
+    for item in items:
+        by_sector.setdefault(item["sector"], []).append(f"{item['name']} {item['quantity']} {item['unit']}")
+    return "\n".join(f"{sector}: {', '.join(products)}" for sector, products in by_sector.items())
+
+
+def embed(text: str, dimensions: int) -> List[float]:
+    """Hashed character-trigram vector: similar names get similar embeddings"""
+    vector = [0.0] * dimensions
+    padded = f"  {text.lower()} "
+    for position in range(len(padded) - 2):
+        digest = hashlib.md5(padded[position:position + 3].encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % dimensions] += 1.0 if digest[4] % 2 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def timings(started: float, prompt: str, tokens: int, eval_seconds: float, load_seconds: float) -> Dict:
+    """Final-chunk statistics in nanoseconds, as reported by Ollama"""
+    return {
+        "total_duration": int((time.monotonic() - started) * 1e9),
+        "load_duration": int(load_seconds * 1e9),
+        "prompt_eval_count": len(TOKEN.findall(prompt)),
+        "prompt_eval_duration": int(load_seconds * 1e9),
+        "eval_count": tokens,
+        "eval_duration": int(eval_seconds * 1e9)
+    }
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    simulator = Simulator(args)
+    app = FastAPI(title="Ollama Simulator")
+
+    def error_response() -> JSONResponse:
+        return JSONResponse(status_code=args.error_status, content={"error": "simulated failure"})
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        model = body.get("model", args.models[0])
+        started = time.monotonic()
+        if simulator.should_fail():
+            return error_response()
+
+        prompt = body.get("prompt")
+        if not prompt:
+            # Preload request: only loads the model
+            return {"model": model, "response": "", "done": True, "done_reason": "load"}
+
+        load_seconds = simulator.latency()
+        text = simulator.respond(prompt, structured=bool(body.get("format")))
+        tokens = TOKEN.findall(text)
+        token_seconds = 1 / args.tokens_per_second if args.tokens_per_second > 0 else 0.0
+
+        if not body.get("stream", True):
+            await asyncio.sleep(load_seconds + token_seconds * len(tokens))
+            eval_seconds = token_seconds * len(tokens)
+            return {"model": model, "response": text, "done": True, **timings(started, prompt, len(tokens), eval_seconds, load_seconds)}
+
+        async def stream():
+            await asyncio.sleep(load_seconds)
+            eval_started = time.monotonic()
+            for token in tokens:
+                await asyncio.sleep(token_seconds)
+                yield json.dumps({"model": model, "response": token, "done": False}, ensure_ascii=False) + "\n"
+            final = {"model": model, "response": "", "done": True}
+            final.update(timings(started, prompt, len(tokens), time.monotonic() - eval_started, load_seconds))
+            yield json.dumps(final) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    @app.post("/api/embed")
+    async def embed_batch(request: Request):
+        body = await request.json()
+        if simulator.should_fail():
+            return error_response()
+        inputs = body.get("input", [])
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        await asyncio.sleep(simulator.latency() * args.embedding_latency_factor)
+        return {"model": body.get("model"), "embeddings": [embed(text, args.embedding_dimensions) for text in inputs]}
+
+    @app.post("/api/embeddings")
+    async def embed_single(request: Request):
+        body = await request.json()
+        if simulator.should_fail():
+            return error_response()
+        await asyncio.sleep(simulator.latency() * args.embedding_latency_factor)
+        return {"embedding": embed(body.get("prompt", ""), args.embedding_dimensions)}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": model, "model": model} for model in args.models]}
+
+    @app.get("/simulator/stats")
+    async def stats():
+        return {"requests": simulator.requests, "errors": simulator.errors}
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor que simula a API do Ollama")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Latência média até o primeiro token")
+    parser.add_argument("--latency-distribution", choices=["fixed", "exponential", "lognormal"], default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Desvio da distribuição lognormal")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="0 responde sem atraso por token")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de requisições que falham")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--responses", help="JSON com respostas prontas: [{\"match\": regex, \"response\": template}]")
+    parser.add_argument("--embedding-dimensions", type=int, default=256)
+    parser.add_argument("--embedding-latency-factor", type=float, default=0.1, help="Fração da latência aplicada a embeddings")
+    parser.add_argument("--models", nargs="+", default=["llama3.2:1b", "nomic-embed-text"])
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    uvicorn.run(create_app(arguments), host=arguments.host, port=arguments.port, log_level="warning")
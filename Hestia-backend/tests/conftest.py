@@ -0,0 +1,85 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Settings are read when the app is imported, so point it at a throwaway SQLite file first
+_database = tempfile.NamedTemporaryFile(prefix="hestia-test-", suffix=".db", delete=False)
+os.environ["DATABASE_URL"] = f"sqlite:///{_database.name}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Not used as a context manager: startup would connect to Ollama and start the workers
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(client):
+    """A freshly registered user as (user id, auth headers)"""
+    email = f"{uuid.uuid4().hex}@example.com"
+    response = client.post("/api/v1/auth/register", json={"name": "Test", "email": email, "password": "secret123"})
+    user_id = response.json()["id"]
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": "secret123"}).json()["access_token"]
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def ollama_simulator():
+    """URL of scripts/ollama_simulator.py running without latency, for deterministic model answers"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    script = Path(__file__).resolve().parent.parent / "scripts" / "ollama_simulator.py"
+    process = subprocess.Popen(
+        [sys.executable, str(script), "--port", str(port), "--latency-ms", "0", "--tokens-per-second", "0"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                httpx.get(f"{url}/api/tags", timeout=1).raise_for_status()
+                break
+            except httpx.HTTPError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Ollama simulator did not start")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+@pytest.fixture
+def simulated_ollama(ollama_simulator, monkeypatch, tmp_path):
+    """An OllamaService talking to the simulator, with its own empty embedding index"""
+    from app.services.ai_service import OllamaService
+
+    monkeypatch.setattr(settings, "ollama_urls", ollama_simulator)
+    monkeypatch.setattr(settings, "embedding_index_dir", str(tmp_path))
+    return OllamaService()
@@ -0,0 +1,36 @@
+import pytest
+
+from app.config import settings
+from app.services.ai_service import CATALOG_RECIPES, CATALOG_THEMES, ollama_service
+from app.services.catalog import list_catalog
+
+
+# Section, free-form text, catalog entry expected to be served (None: the LLM generates it)
+CATALOG_CASES = [
+    (CATALOG_THEMES, "Churrasco para 10 pessoas", "churrasco"),
+    (CATALOG_THEMES, "Café da manhã", "café da manhã"),
+    # Similarity exactly catalog_min_similarity (0.8): still served from the catalog
+    (CATALOG_THEMES, "Churrasco p/ 10", "churrasco"),
+    (CATALOG_THEMES, "Churrascão", None),
+    (CATALOG_THEMES, "Jantar romântico", None),
+    (CATALOG_THEMES, "Festa de aniversário", None),
+    (CATALOG_RECIPES, "Lasanha bolonhesa", "lasanha"),
+    (CATALOG_RECIPES, "Feijoada completa", "feijoada"),
+    (CATALOG_RECIPES, "Pizza 4 queijos", None),
+    (CATALOG_RECIPES, "Bolo de chocolate", None),
+]
+
+
+@pytest.mark.parametrize("section, text, entry", CATALOG_CASES)
+def test_catalog_match_against_threshold(section, text, entry):
+    served = ollama_service._catalog_items(section, text, 2)
+
+    if entry is None:
+        assert served is None
+    else:
+        assert served == ollama_service._catalog_items(section, entry, 2)
+        assert list_catalog.match(section, text)[0].name == entry
+
+
+def test_catalog_boundary_score_is_exactly_the_threshold():
+    assert list_catalog.match(CATALOG_THEMES, "Churrasco p/ 10")[1] == pytest.approx(settings.catalog_min_similarity)
@@ -0,0 +1,152 @@
+import pytest
+
+from app.services import circuit_breaker as circuit_breaker_module
+from app.services.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", clock)
+    return clock
+
+
+def _breaker(**overrides):
+    options = dict(
+        failure_rate_threshold=0.5,
+        slow_call_rate_threshold=0.8,
+        slow_call_seconds=10,
+        window_size=10,
+        min_calls=4,
+        open_seconds=30,
+        half_open_max_calls=2
+    )
+    options.update(overrides)
+    return CircuitBreaker(**options)
+
+
+def _call(breaker, failed=False, elapsed=0.1):
+    assert breaker.allow_request()
+    if failed:
+        breaker.record_failure()
+    else:
+        breaker.record_success(elapsed)
+
+
+def _open(breaker):
+    for _ in range(breaker.min_calls):
+        _call(breaker, failed=True)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_stays_closed_until_min_calls_are_seen(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _call(breaker, failed=True)
+    assert breaker.state == CircuitState.CLOSED
+
+    _call(breaker, failed=True)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 1
+
+
+@pytest.mark.parametrize("outcomes, state", [
+    ([False, False, True, True], CircuitState.OPEN),
+    ([False, False, False, True], CircuitState.CLOSED),
+])
+def test_opens_at_the_failure_rate_threshold(clock, outcomes, state):
+    breaker = _breaker()
+    for failed in outcomes:
+        _call(breaker, failed=failed)
+    assert breaker.state == state
+
+
+@pytest.mark.parametrize("elapsed, state", [
+    ([10, 10, 10, 10], CircuitState.OPEN),
+    ([10, 10, 10, 9.9], CircuitState.OPEN),
+    ([10, 10, 9.9, 9.9], CircuitState.CLOSED),
+])
+def test_opens_at_the_slow_call_rate_threshold(clock, elapsed, state):
+    breaker = _breaker(slow_call_rate_threshold=0.75)
+    for seconds in elapsed:
+        _call(breaker, elapsed=seconds)
+    assert breaker.state == state
+
+
+def test_open_circuit_rejects_calls_until_open_seconds_pass(clock):
+    breaker = _breaker()
+    _open(breaker)
+
+    clock.now += 29.9
+    assert not breaker.allow_request()
+    assert breaker.short_circuited == 1
+
+    clock.now += 0.1
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_half_open_admits_limited_probes_and_closes_after_they_succeed(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitState.CLOSED
+    # A closed circuit starts from a clean window
+    _call(breaker, failed=True)
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.parametrize("outcome", ["failure", "slow"])
+def test_half_open_reopens_on_a_failed_or_slow_probe(clock, outcome):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+
+    assert breaker.allow_request()
+    if outcome == "failure":
+        breaker.record_failure()
+    else:
+        breaker.record_success(10)
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow_request()
+
+
+def test_release_frees_a_half_open_probe_slot(clock):
+    breaker = _breaker()
+    _open(breaker)
+    clock.now += 30
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release()
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_release_records_no_outcome_while_closed(clock):
+    breaker = _breaker()
+    for _ in range(10):
+        assert breaker.allow_request()
+        breaker.release()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.stats()["state"] == "closed"
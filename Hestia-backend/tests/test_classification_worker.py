@@ -0,0 +1,76 @@
+import asyncio
+
+from app.config import settings
+from app.models.item import Item, SupermarketSector
+from app.models.shopping_list import ShoppingList
+from app.services import classification_worker as worker_module
+from app.services.ai_service import InferenceUnavailable
+from app.services.classification_worker import ClassificationWorker
+
+
+def _pending_item(db, user_id):
+    shopping_list = ShoppingList(name="Lista", user_id=user_id)
+    shopping_list.items = [Item(name="Kombucha", quantity=1, unit="un", sector_pending=True)]
+    db.add(shopping_list)
+    db.commit()
+    return shopping_list.items[0]
+
+
+def _run_worker(worker, item):
+    async def run():
+        worker.submit(item.id, item.name)
+        task = asyncio.create_task(worker._work())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_item_stays_pending_while_model_is_unavailable(db, user, monkeypatch):
+    item = _pending_item(db, user[0])
+    answers = []
+
+    async def classify_products(names, require_model=False):
+        if not answers:
+            answers.append(None)
+            raise InferenceUnavailable("Ollama gave no answer")
+        return [(SupermarketSector.BEBIDAS, None)]
+
+    monkeypatch.setattr(worker_module.ollama_service, "classify_products", classify_products)
+    monkeypatch.setattr(settings, "classification_batch_window_seconds", 0)
+    monkeypatch.setattr(settings, "inference_retry_after_seconds", 0.01)
+    worker = ClassificationWorker()
+
+    _run_worker(worker, item)
+
+    db.refresh(item)
+    assert worker.retries == 1
+    assert (item.sector, item.sector_pending) == (SupermarketSector.BEBIDAS, False)
+
+
+def test_batch_is_retried_when_sectors_cannot_be_saved(db, user, monkeypatch):
+    item = _pending_item(db, user[0])
+    store = ClassificationWorker._store
+    failures = []
+
+    def flaky_store(self, sectors):
+        if not failures:
+            failures.append(sectors)
+            raise worker_module.SQLAlchemyError("database is locked")
+        store(self, sectors)
+
+    async def classify_products(names, require_model=False):
+        return [(SupermarketSector.BEBIDAS, None)]
+
+    monkeypatch.setattr(ClassificationWorker, "_store", flaky_store)
+    monkeypatch.setattr(worker_module.ollama_service, "classify_products", classify_products)
+    monkeypatch.setattr(settings, "classification_batch_window_seconds", 0)
+    monkeypatch.setattr(settings, "inference_retry_after_seconds", 0.01)
+    worker = ClassificationWorker()
+
+    _run_worker(worker, item)
+
+    db.refresh(item)
+    assert len(failures) == 1
+    assert (item.sector, item.sector_pending) == (SupermarketSector.BEBIDAS, False)
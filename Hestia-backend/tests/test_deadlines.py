@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.ai_service import OllamaService
+from app.services.circuit_breaker import CircuitState
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "embedding_index_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "ollama_read_timeout", 60.0)
+    return OllamaService()
+
+
+def _install(service, handler):
+    for backend in service.pool.backends:
+        backend._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=backend.url)
+
+
+def test_calls_read_for_their_whole_deadline(service):
+    read_timeouts = []
+
+    def handler(request):
+        read_timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"response": "ok", "done": True})
+
+    _install(service, handler)
+
+    assert asyncio.run(service._make_request("Lista de compras", deadline=90)) == "ok"
+    assert 89 < read_timeouts[0] <= 90
+
+
+def test_streams_read_for_the_generation_deadline(service):
+    read_timeouts = []
+
+    def handler(request):
+        read_timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, content=json.dumps({"response": "ok", "done": True}) + "\n")
+
+    _install(service, handler)
+
+    async def collect():
+        return [chunk async for chunk in service._stream_generate("Lista de compras")]
+
+    assert asyncio.run(collect()) == ["ok"]
+    assert read_timeouts[0] > settings.ollama_read_timeout
+
+
+def test_stream_is_cut_off_at_the_generation_deadline(service, monkeypatch):
+    monkeypatch.setattr(settings, "generation_deadline_seconds", 0.2)
+
+    async def lines():
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            yield (json.dumps({"response": "tomate ", "done": False}) + "\n").encode()
+
+    _install(service, lambda request: httpx.Response(200, content=lines()))
+
+    async def collect():
+        chunks = []
+        with pytest.raises(httpx.ReadTimeout):
+            async for chunk in service._stream_generate("Lista de compras"):
+                chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(collect())
+
+    assert 0 < len(chunks) < 10
+    # The stream started fine: running long is not a backend failure
+    assert service.breaker.state == CircuitState.CLOSED
+
+
+def test_batch_classification_deadline_grows_with_the_batch(service, monkeypatch):
+    monkeypatch.setattr(settings, "classify_deadline_seconds", 15.0)
+    monkeypatch.setattr(settings, "classify_deadline_per_item_seconds", 0.5)
+    read_timeouts = []
+
+    def handler(request):
+        read_timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"response": "1: hortifruti", "done": True})
+
+    _install(service, handler)
+
+    products = [f"produto {number}" for number in range(40)]
+    sectors = asyncio.run(service._classify_batch_with_llm(products))
+
+    assert sectors[0] is not None
+    assert 34 < read_timeouts[0] <= 35
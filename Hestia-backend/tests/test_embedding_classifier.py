@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.ai_service import OllamaService
+from app.services.circuit_breaker import CircuitState
+
+
+def _service(monkeypatch, tmp_path, handler):
+    monkeypatch.setattr(settings, "embedding_index_dir", str(tmp_path))
+    service = OllamaService()
+    for backend in service.pool.backends:
+        backend._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=backend.url)
+    return service
+
+
+def _ollama(embed_status, models=("llama3.2:1b",)):
+    def handler(request):
+        if request.url.path == "/api/tags":
+            return httpx.Response(200, json={"models": [{"name": name} for name in models]})
+        if request.url.path == "/api/embed":
+            return httpx.Response(embed_status, json={"error": "model not found"})
+        if request.url.path == "/api/generate":
+            assert json.loads(request.content)["model"] == settings.ollama_model
+            return httpx.Response(200, json={"response": "bebidas", "done": True})
+        return httpx.Response(404)
+    return handler
+
+
+@pytest.mark.parametrize("models, missing", [
+    (("llama3.2:1b",), True),
+    (("llama3.2:1b", "nomic-embed-text:latest"), False),
+    (("nomic-embed-text",), False),
+])
+def test_embedding_classifier_follows_the_pulled_models(monkeypatch, tmp_path, models, missing):
+    service = _service(monkeypatch, tmp_path, _ollama(200, models))
+
+    asyncio.run(service.check_embedding_model())
+
+    assert service.embedding_model_missing is missing
+    assert service.embeddings_enabled is not missing
+
+
+def test_unknown_embedding_model_does_not_open_any_circuit(monkeypatch, tmp_path):
+    service = _service(monkeypatch, tmp_path, _ollama(404))
+
+    async def run():
+        await service.seed_embedding_index()
+        return await service._make_request("Classifique", deadline=5)
+
+    assert asyncio.run(run()) == "bebidas"
+    assert service.breaker.state == CircuitState.CLOSED
+    assert service.embedding_breaker.state == CircuitState.CLOSED
+
+
+def test_failing_embeddings_only_open_the_embedding_circuit(monkeypatch, tmp_path):
+    service = _service(monkeypatch, tmp_path, _ollama(500))
+
+    async def run():
+        await service.seed_embedding_index()
+        return await service._make_request("Classifique", deadline=5)
+
+    assert asyncio.run(run()) == "bebidas"
+    assert service.embedding_breaker.state == CircuitState.OPEN
+    assert service.breaker.state == CircuitState.CLOSED
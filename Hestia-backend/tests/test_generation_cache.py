@@ -0,0 +1,18 @@
+from app.services.generation_cache import GenerationCache
+from app.services.normalization import mentioned_people_count, normalize_theme
+
+
+def test_only_explicit_people_counts_are_stripped():
+    assert normalize_theme("Churrasco para 10 pessoas") == "churrasco"
+    assert normalize_theme("Jantar 8 convidados") == "jantar"
+    assert normalize_theme("Festa de 15 anos") != normalize_theme("Festa de 50 anos")
+    assert normalize_theme("Pizza 4 queijos") == "pizza 4 queijos"
+    assert mentioned_people_count("Bolo 3 leites") is None
+
+
+def test_count_in_theme_sets_the_stored_per_person_quantities():
+    cache = GenerationCache()
+    cache.set("list", "model", "Churrasco para 10 pessoas", 1, [{"name": "Carne", "quantity": 4, "unit": "kg"}])
+
+    assert cache.get("list", "model", "churrasco", 8) == [{"name": "Carne", "quantity": 3.2, "unit": "kg"}]
+    assert cache.get("list", "model", "Churrasco para 10 pessoas", 1)[0]["quantity"] == 4
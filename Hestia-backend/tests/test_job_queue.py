@@ -0,0 +1,55 @@
+import asyncio
+
+from app.config import settings
+from app.models.generation_job import GenerationJob, JobKind, JobStatus
+from app.models.item import Item, SupermarketSector
+from app.services.classification_worker import classification_worker
+from app.services.job_queue import JobQueue
+
+
+def test_completed_job_hands_unclassified_items_to_the_worker(db, user, monkeypatch):
+    job = GenerationJob(user_id=user[0], kind=JobKind.SHOPPING_LIST, params={"theme": "Churrasco", "people_count": 4})
+    db.add(job)
+    db.commit()
+    submitted = []
+
+    async def generate(self, claimed):
+        items = [
+            {"name": "Picanha", "quantity": 2, "unit": "kg", "sector": "congelados"},
+            {"name": "Kombucha", "quantity": 1, "unit": "un", "sector": None},
+        ]
+        return {"name": "Lista IA: Churrasco"}, items
+
+    monkeypatch.setattr(JobQueue, "_generate", generate)
+    monkeypatch.setattr(classification_worker, "submit", lambda item_id, name: submitted.append((item_id, name)))
+    monkeypatch.setattr(settings, "job_poll_interval_seconds", 0.01)
+
+    async def run():
+        task = asyncio.create_task(JobQueue()._work("test-worker"))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+    db.refresh(job)
+    assert job.status == JobStatus.SUCCEEDED
+    items = {item.name: item for item in db.query(Item).filter(Item.shopping_list_id == job.shopping_list_id)}
+    assert (items["Picanha"].sector, items["Picanha"].sector_pending) == (SupermarketSector.CONGELADOS, False)
+    assert (items["Kombucha"].sector, items["Kombucha"].sector_pending) == (None, True)
+    assert submitted == [(items["Kombucha"].id, "Kombucha")]
+
+
+def test_lost_lease_saves_nothing(db, user):
+    job = GenerationJob(
+        user_id=user[0], kind=JobKind.SHOPPING_LIST, params={"theme": "Festa"},
+        status=JobStatus.RUNNING, locked_by="other-worker"
+    )
+    db.add(job)
+    db.commit()
+
+    pending = JobQueue()._complete(job.id, "test-worker", user[0], {"name": "Lista"}, [{"name": "Kombucha", "quantity": 1, "unit": "un"}])
+
+    db.refresh(job)
+    assert pending is None
+    assert job.status == JobStatus.RUNNING
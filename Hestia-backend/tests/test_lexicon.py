@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.models.item import SupermarketSector
+from app.services.ai_service import build_product_lexicon, ollama_service
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    return build_product_lexicon()
+
+
+# Product, expected best sector, whether it clears lexicon_min_confidence (otherwise the LLM decides)
+LEXICON_CASES = [
+    ("Tomate", SupermarketSector.HORTIFRUTI, True),
+    ("tomates", SupermarketSector.HORTIFRUTI, True),
+    ("Suco de laranja", SupermarketSector.BEBIDAS, True),
+    ("Pão de queijo congelado", SupermarketSector.CONGELADOS, True),
+    ("Detergente neutro", SupermarketSector.LIMPEZA, True),
+    ("Cerveja artesanal", SupermarketSector.BEBIDAS, True),
+    ("Queijo minas xyzq", SupermarketSector.PADARIA, True),
+    ("Água tônica", SupermarketSector.BEBIDAS, False),
+    ("2 kg arroz", SupermarketSector.MERCEARIA, False),
+    # Wrong best guess, but unknown words dilute it below the threshold
+    ("Papel higiênico folha dupla", SupermarketSector.LIMPEZA, False),
+]
+
+
+@pytest.mark.parametrize("product, sector, local", LEXICON_CASES)
+def test_lexicon_classification_against_threshold(lexicon, product, sector, local):
+    best_sector, confidence = lexicon.classify(product)
+
+    assert best_sector == sector
+    assert (confidence >= settings.lexicon_min_confidence) is local
+
+
+@pytest.mark.parametrize("product", ["kombucha", "lorem ipsum", "de para com", "12"])
+def test_lexicon_has_no_answer_for_unknown_words(lexicon, product):
+    assert lexicon.classify(product) is None
+
+
+def test_lexicon_match_exactly_at_the_threshold_is_used(monkeypatch):
+    _, confidence = ollama_service.lexicon.classify("Queijo minas xyzq")
+    monkeypatch.setattr(settings, "lexicon_min_confidence", confidence)
+    assert asyncio.run(ollama_service._classify_without_llm("Queijo minas xyzq")) == (SupermarketSector.PADARIA, confidence)
+
+    monkeypatch.setattr(settings, "lexicon_min_confidence", confidence + 0.0001)
+    assert asyncio.run(ollama_service.classify_product_locally("Queijo minas xyzq")) is None
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from app.services.list_parser import JsonItemStreamParser, TextListParser, parse_json_list, parse_text_list, validate_item
+
+ITEMS = [
+    {"name": 'Pão "francês" {fatiado}', "quantity": 10, "unit": "un", "sector": "padaria"},
+    {"name": "Limão\\taiti", "quantity": 0.5, "unit": "kg", "sector": "hortifruti"},
+    {"name": "Feijão", "quantity": 1, "unit": "kg", "sector": "mercearia", "notes": {"tags": ["[x]", "}"]}},
+    {"name": "Cerveja", "quantity": 12, "unit": "latas", "sector": "bebidas"},
+]
+# ensure_ascii turns "ã" into ã escapes, which a split can cut in the middle
+JSON_RESPONSE = json.dumps({"items": ITEMS}, ensure_ascii=True, indent=1)
+EXPECTED_JSON_ITEMS = [
+    {"name": 'Pão "francês" {fatiado}', "quantity": 10.0, "unit": "un", "sector": "padaria"},
+    {"name": "Limão\\taiti", "quantity": 0.5, "unit": "kg", "sector": "hortifruti"},
+    {"name": "Feijão", "quantity": 1.0, "unit": "kg", "sector": "mercearia"},
+    {"name": "Cerveja", "quantity": 12.0, "unit": "un", "sector": "bebidas"},
+]
+
+TEXT_RESPONSE = "hortifruti: tomate 0.5 kg, alface 1 un\nmercearia: carne moída 1.2kg, arroz 1 kg\nbebidas: cerveja 12 un"
+EXPECTED_TEXT_ITEMS = [
+    {"name": "tomate", "quantity": 0.5, "unit": "kg", "sector": "hortifruti"},
+    {"name": "alface", "quantity": 1.0, "unit": "un", "sector": "hortifruti"},
+    {"name": "carne moída", "quantity": 1.2, "unit": "kg", "sector": "mercearia"},
+    {"name": "arroz", "quantity": 1.0, "unit": "kg", "sector": "mercearia"},
+    {"name": "cerveja", "quantity": 12.0, "unit": "un", "sector": "bebidas"},
+]
+
+
+def _feed(parser, chunks):
+    items = []
+    for chunk in chunks:
+        items += parser.feed(chunk)
+    return items + parser.close()
+
+
+def test_json_parser_whole_response():
+    assert parse_json_list(JSON_RESPONSE) == EXPECTED_JSON_ITEMS
+
+
+def test_json_parser_one_character_at_a_time():
+    assert _feed(JsonItemStreamParser(), JSON_RESPONSE) == EXPECTED_JSON_ITEMS
+
+
+@pytest.mark.parametrize("split", range(1, len(JSON_RESPONSE)))
+def test_json_parser_split_at_every_position(split):
+    chunks = [JSON_RESPONSE[:split], JSON_RESPONSE[split:]]
+    assert _feed(JsonItemStreamParser(), chunks) == EXPECTED_JSON_ITEMS
+
+
+def test_json_parser_emits_each_item_as_soon_as_it_closes():
+    parser = JsonItemStreamParser()
+    first_item_end = JSON_RESPONSE.index("}", JSON_RESPONSE.index("padaria")) + 1
+
+    assert parser.feed(JSON_RESPONSE[:first_item_end - 1]) == []
+    assert parser.feed(JSON_RESPONSE[first_item_end - 1:first_item_end]) == EXPECTED_JSON_ITEMS[:1]
+
+
+def test_json_parser_truncated_output_keeps_complete_items_only():
+    truncated = JSON_RESPONSE[:JSON_RESPONSE.index("Cerveja")]
+    assert _feed(JsonItemStreamParser(), truncated) == EXPECTED_JSON_ITEMS[:3]
+
+
+def test_json_parser_skips_invalid_items():
+    response = '{"items": [{"name": "Sabão", "quantity": 1, "unit": "un", "sector": "açougue"}, {"name": "", "sector": "limpeza"}, 3, {"name": "Detergente", "sector": "limpeza"}]}'
+    assert parse_json_list(response) == [{"name": "Detergente", "quantity": 1.0, "unit": "un", "sector": "limpeza"}]
+
+
+def test_text_parser_whole_response():
+    assert parse_text_list(TEXT_RESPONSE) == EXPECTED_TEXT_ITEMS
+
+
+def test_text_parser_one_character_at_a_time():
+    assert _feed(TextListParser(), TEXT_RESPONSE) == EXPECTED_TEXT_ITEMS
+
+
+@pytest.mark.parametrize("split", range(1, len(TEXT_RESPONSE)))
+def test_text_parser_split_at_every_position(split):
+    chunks = [TEXT_RESPONSE[:split], TEXT_RESPONSE[split:]]
+    assert _feed(TextListParser(), chunks) == EXPECTED_TEXT_ITEMS
+
+
+def test_text_parser_emits_items_when_their_separator_arrives():
+    parser = TextListParser()
+    assert parser.feed("hortifruti: tomate 0.5 k") == []
+    assert parser.feed("g, alf") == EXPECTED_TEXT_ITEMS[:1]
+    assert parser.close() == [{"name": "alf", "quantity": 1.0, "unit": "un", "sector": "hortifruti"}]
+
+
+def test_text_parser_ignores_lines_without_a_known_sector():
+    response = "Aqui está a lista:\naçougue: picanha 1 kg\n**Bebidas**: água 2 L\n"
+    assert parse_text_list(response) == [{"name": "água", "quantity": 2.0, "unit": "L", "sector": "bebidas"}]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ({"name": " Arroz ", "quantity": "2", "unit": "Quilos", "sector": "Mercearia"},
+     {"name": "Arroz", "quantity": 2.0, "unit": "kg", "sector": "mercearia"}),
+    ({"name": "Sal", "quantity": -1, "unit": 5, "sector": "mercearia"},
+     {"name": "Sal", "quantity": 1.0, "unit": "un", "sector": "mercearia"}),
+    ({"name": "Sal", "quantity": "muito", "sector": "mercearia"},
+     {"name": "Sal", "quantity": 1.0, "unit": "un", "sector": "mercearia"}),
+    ({"name": "Sal", "sector": "açougue"}, None),
+    ({"name": "   ", "sector": "mercearia"}, None),
+    ({"sector": "mercearia"}, None),
+    (["Sal", 1, "un", "mercearia"], None),
+])
+def test_validate_item(raw, expected):
+    assert validate_item(raw) == expected
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Run in a subprocess outside the backend directory, whose alembic/ folder shadows the alembic package
+UPGRADE_SQL = f"""
+from alembic import command
+from alembic.config import Config
+config = Config({str(BACKEND_DIR / "alembic.ini")!r})
+config.set_main_option("script_location", {str(BACKEND_DIR / "alembic")!r})
+command.upgrade(config, "head", sql=True)
+"""
+
+
+def test_offline_upgrade_emits_the_whole_schema(tmp_path):
+    result = subprocess.run([sys.executable, "-c", UPGRADE_SQL], cwd=tmp_path, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    for table in ("users", "shopping_lists", "items", "product_classifications", "generation_jobs"):
+        assert f"CREATE TABLE {table}" in result.stdout
+    assert "ix_shopping_lists_user_id_id" in result.stdout
@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ollama_pool import MIN_HEDGE_SAMPLES, OllamaPool
+
+
+def _pool(handlers, hedge_percentile=0.0):
+    pool = OllamaPool([f"http://ollama-{n}:11434" for n in range(len(handlers))], health_interval=0, hedge_percentile=hedge_percentile)
+    for backend, handler in zip(pool.backends, handlers):
+        backend._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=backend.url)
+    return pool
+
+
+def _answer(name):
+    def handler(request):
+        return httpx.Response(200, json={"backend": name})
+    return handler
+
+
+def test_pick_prefers_the_healthy_backend_with_fewest_outstanding_calls():
+    pool = _pool([_answer("a"), _answer("b"), _answer("c")])
+    a, b, c = pool.backends
+    a.outstanding, b.outstanding, c.outstanding = 3, 1, 2
+    assert all(pool.pick() is b for _ in range(5))
+
+    b.healthy = False
+    assert all(pool.pick() is c for _ in range(5))
+
+
+def test_pick_rotates_between_idle_backends():
+    pool = _pool([_answer("a"), _answer("b")])
+    assert {pool.pick() for _ in range(4)} == set(pool.backends)
+
+
+def test_pick_falls_back_to_any_backend_when_none_is_healthy():
+    pool = _pool([_answer("a"), _answer("b")])
+    for backend in pool.backends:
+        backend.healthy = False
+    assert pool.pick() in pool.backends
+    assert pool.pick(exclude=pool.backends[0]) is None
+
+
+def test_refused_connection_takes_the_backend_out_until_the_health_check_passes():
+    state = {"up": False}
+
+    def handler(request):
+        if not state["up"]:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"models": []})
+
+    pool = _pool([handler])
+    backend = pool.backends[0]
+
+    async def run():
+        with pytest.raises(httpx.ConnectError):
+            await pool.post("/api/generate", {})
+        down = backend.healthy
+        state["up"] = True
+        await pool._check(backend)
+        return down
+
+    assert asyncio.run(run()) is False
+    assert backend.healthy is True
+    assert (backend.failures, backend.outstanding) == (1, 0)
+
+
+def test_http_errors_count_as_failures_without_marking_the_backend_down():
+    pool = _pool([lambda request: httpx.Response(500)])
+    backend = pool.backends[0]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(pool.post("/api/generate", {}))
+
+    assert backend.healthy is True
+    assert backend.failures == 1
+
+
+@pytest.mark.parametrize("response, healthy", [(httpx.Response(200, json={"models": []}), True), (httpx.Response(503), False)])
+def test_health_check_follows_api_tags(response, healthy):
+    pool = _pool([lambda request: response])
+    pool.backends[0].healthy = not healthy
+
+    asyncio.run(pool._check(pool.backends[0]))
+
+    assert pool.backends[0].healthy is healthy
+
+
+def _hedging_pool():
+    calls = []
+
+    async def handler(request, name):
+        calls.append(name)
+        if len(calls) == 1:
+            # The first backend asked is the slow one
+            await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"backend": name})
+
+    pool = _pool([lambda request: handler(request, "a"), lambda request: handler(request, "b")], hedge_percentile=0.9)
+    pool._latencies.extend([0.01] * MIN_HEDGE_SAMPLES)
+    return pool, calls
+
+
+def test_slow_call_is_hedged_on_another_backend_and_the_first_answer_wins():
+    pool, calls = _hedging_pool()
+
+    response = asyncio.run(pool.post("/api/generate", {}))
+
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert response.json()["backend"] == calls[1]
+    assert (pool.hedged, pool.hedge_wins) == (1, 1)
+    assert all(backend.outstanding == 0 for backend in pool.backends)
+
+
+def test_no_hedging_without_a_second_healthy_backend():
+    pool, calls = _hedging_pool()
+    pool.backends[1].healthy = False
+
+    asyncio.run(pool.post("/api/generate", {}))
+
+    assert calls == ["a"]
+    assert pool.hedged == 0
+
+
+def test_no_hedging_before_enough_latency_samples():
+    pool, calls = _hedging_pool()
+    pool._latencies.clear()
+
+    asyncio.run(pool.post("/api/generate", {}))
+
+    assert len(calls) == 1
+    assert pool.hedged == 0
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+
+from app.models.item import SupermarketSector
+
+SECTORS = {sector.value for sector in SupermarketSector}
+
+
+def _simulator_requests(url):
+    return httpx.get(f"{url}/simulator/stats").json()["requests"]
+
+
+def test_generate_shopping_list(simulated_ollama, ollama_simulator):
+    before = _simulator_requests(ollama_simulator)
+
+    items = asyncio.run(simulated_ollama.generate_shopping_list("Encontro zzq do simulador", 4))
+
+    assert _simulator_requests(ollama_simulator) == before + 1
+    assert 8 <= len(items) <= 12
+    assert all(item["sector"] in SECTORS and item["quantity"] > 0 for item in items)
+
+
+def test_stream_shopping_list(simulated_ollama, ollama_simulator):
+    async def collect():
+        return [item async for item in simulated_ollama.stream_shopping_list("Reunião zzq transmitida", 2)]
+
+    before = _simulator_requests(ollama_simulator)
+
+    items = asyncio.run(collect())
+
+    assert _simulator_requests(ollama_simulator) == before + 1
+    assert 8 <= len(items) <= 12
+    assert all(item["sector"] in SECTORS for item in items)
+
+
+def test_classify_product(simulated_ollama, ollama_simulator):
+    before = _simulator_requests(ollama_simulator)
+
+    sector = asyncio.run(simulated_ollama.classify_product("Kombucha zzq de garrafa"))
+
+    # The simulator files products without a known keyword under mercearia
+    assert _simulator_requests(ollama_simulator) > before
+    assert sector == SupermarketSector.MERCEARIA
@@ -0,0 +1,50 @@
+from app.models.item import Item
+from app.models.shopping_list import ShoppingList
+
+
+def _walk(client, url, headers, limit):
+    """Follow cursors until the last page; returns every page"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+        assert len(pages) <= 10, "cursor never reached the last page"
+
+
+def test_shopping_lists_pages_cover_every_list_once(client, db, user):
+    user_id, headers = user
+    # Inserted in one statement, so several lists share the same stored created_at
+    lists = [ShoppingList(name=f"Lista {n}", user_id=user_id) for n in range(7)]
+    db.add_all(lists)
+    db.commit()
+
+    pages = _walk(client, "/api/v1/shopping-lists/", headers, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == sorted((shopping_list.id for shopping_list in lists), reverse=True)
+
+
+def test_list_items_pages_cover_every_item_once(client, db, user):
+    user_id, headers = user
+    shopping_list = ShoppingList(name="Lista", user_id=user_id)
+    db.add(shopping_list)
+    db.flush()
+    items = [Item(name=f"Item {n}", quantity=1, unit="un", shopping_list_id=shopping_list.id) for n in range(5)]
+    db.add_all(items)
+    db.commit()
+
+    pages = _walk(client, f"/api/v1/shopping-lists/{shopping_list.id}/items", headers, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == [item.id for item in items]
+
+
+def test_invalid_cursor_is_rejected(client, user):
+    _, headers = user
+    response = client.get("/api/v1/shopping-lists/", params={"cursor": "garbage!"}, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import async_engine
+from app.models.item import Item
+from app.models.shopping_list import ShoppingList
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _add_lists(db, user_id, list_count, item_count):
+    for n in range(list_count):
+        shopping_list = ShoppingList(name=f"Lista {n}", user_id=user_id)
+        shopping_list.items = [Item(name=f"Item {k}", quantity=1, unit="un") for k in range(item_count)]
+        db.add(shopping_list)
+    db.commit()
+
+
+def _queries_for_user_lists(client, headers):
+    with count_queries() as statements:
+        response = client.get("/api/v1/shopping-lists/", headers=headers)
+    assert response.status_code == 200
+    return len(statements), response.json()
+
+
+def test_listing_shopping_lists_issues_constant_queries(client, db, user):
+    user_id, headers = user
+
+    _add_lists(db, user_id, list_count=1, item_count=1)
+    few_queries, lists = _queries_for_user_lists(client, headers)
+    assert len(lists) == 1
+
+    _add_lists(db, user_id, list_count=10, item_count=5)
+    many_queries, lists = _queries_for_user_lists(client, headers)
+    assert len(lists) == 11
+    assert sum(len(shopping_list["items"]) for shopping_list in lists) == 51
+
+    # Auth lookup, the page of lists and one selectin load for all their items
+    assert many_queries == few_queries
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.services.scheduler import (
+    DeadlineExceededError,
+    InferenceScheduler,
+    PRIORITY_BACKGROUND,
+    PRIORITY_CLASSIFICATION,
+    PRIORITY_GENERATION,
+    QueueFullError,
+)
+
+
+async def _hold(scheduler, priority, order, name, release, timeout=1.0):
+    async with scheduler.slot(priority, timeout):
+        order.append(name)
+        await release.wait()
+
+
+def test_queued_calls_are_admitted_by_priority_then_arrival():
+    async def run():
+        scheduler = InferenceScheduler(max_concurrency=1, max_queue=10, retry_after=1)
+        order = []
+        gate, done = asyncio.Event(), asyncio.Event()
+        done.set()
+        holder = asyncio.create_task(_hold(scheduler, PRIORITY_GENERATION, order, "holder", gate))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(_hold(scheduler, priority, order, name, done))
+            for priority, name in [
+                (PRIORITY_BACKGROUND, "background"),
+                (PRIORITY_GENERATION, "generation-1"),
+                (PRIORITY_CLASSIFICATION, "classification"),
+                (PRIORITY_GENERATION, "generation-2"),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 4
+        gate.set()
+        await asyncio.gather(holder, *waiters)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(run())
+
+    assert order == ["holder", "classification", "generation-1", "generation-2", "background"]
+    assert (stats["active"], stats["queued"], stats["admitted"]) == (0, 0, 5)
+
+
+def test_full_queue_rejects_with_429():
+    async def run():
+        scheduler = InferenceScheduler(max_concurrency=1, max_queue=1, retry_after=2.5)
+        order, gate = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(scheduler, PRIORITY_GENERATION, order, n, gate)) for n in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError) as rejected:
+            async with scheduler.slot(PRIORITY_CLASSIFICATION, 1.0):
+                pass
+        gate.set()
+        await asyncio.gather(*tasks)
+        return rejected.value, scheduler.stats()
+
+    error, stats = asyncio.run(run())
+
+    assert (error.status_code, error.retry_after) == (429, 2.5)
+    assert (stats["rejected"], stats["admitted"], stats["queued"]) == (1, 2, 0)
+
+
+def test_call_not_admitted_before_its_deadline_fails_with_503():
+    async def run():
+        scheduler = InferenceScheduler(max_concurrency=1, max_queue=5, retry_after=1)
+        order, gate = [], asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, PRIORITY_GENERATION, order, "holder", gate))
+        await asyncio.sleep(0)
+        with pytest.raises(DeadlineExceededError) as expired:
+            async with scheduler.slot(PRIORITY_CLASSIFICATION, 0.01):
+                pass
+        after_timeout = scheduler.stats()
+        gate.set()
+        await holder
+        # The abandoned waiter must not leak the slot
+        async with scheduler.slot(PRIORITY_CLASSIFICATION, 0.01):
+            pass
+        return expired.value, after_timeout, scheduler.stats()
+
+    error, after_timeout, stats = asyncio.run(run())
+
+    assert error.status_code == 503
+    assert (after_timeout["queued"], after_timeout["deadline_exceeded"]) == (0, 1)
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        scheduler = InferenceScheduler(max_concurrency=1, max_queue=5, retry_after=1)
+        order, gate = [], asyncio.Event()
+        holder = asyncio.create_task(_hold(scheduler, PRIORITY_GENERATION, order, "holder", gate))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_hold(scheduler, PRIORITY_CLASSIFICATION, order, "cancelled", gate))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queued = scheduler.stats()["queued"]
+        gate.set()
+        await holder
+        return order, queued, scheduler.stats()
+
+    order, queued, stats = asyncio.run(run())
+
+    assert order == ["holder"]
+    assert queued == 0
+    assert (stats["active"], stats["queued"]) == (0, 0)
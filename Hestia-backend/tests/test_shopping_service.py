@@ -0,0 +1,37 @@
+import asyncio
+
+from app.database import AsyncSessionLocal
+from app.models.item import Item, SupermarketSector
+from app.schemas.item import ItemCreate
+from app.schemas.shopping_list import ShoppingListCreate
+from app.services.ai_service import ollama_service
+from app.services.classification_worker import classification_worker
+from app.services.shopping_service import ShoppingService
+
+
+def test_items_left_without_sector_are_queued_for_classification(db, user, monkeypatch):
+    submitted = []
+
+    async def classify_products(names, require_model=False):
+        # The model answered for the first name only
+        return [(SupermarketSector.BEBIDAS, None), None]
+
+    monkeypatch.setattr(ollama_service, "classify_products", classify_products)
+    monkeypatch.setattr(classification_worker, "submit", lambda item_id, name: submitted.append((item_id, name)))
+
+    async def create():
+        async with AsyncSessionLocal() as session:
+            return await ShoppingService.create_shopping_list_with_items(
+                session,
+                user[0],
+                ShoppingListCreate(name="Lista"),
+                [ItemCreate(name="Kombucha"), ItemCreate(name="Xyzzy"), ItemCreate(name="Pão", sector="padaria")]
+            )
+
+    _, item_ids = asyncio.run(create())
+
+    items = {item.name: item for item in db.query(Item).filter(Item.id.in_(item_ids))}
+    assert (items["Kombucha"].sector, items["Kombucha"].sector_pending) == (SupermarketSector.BEBIDAS, False)
+    assert (items["Xyzzy"].sector, items["Xyzzy"].sector_pending) == (None, True)
+    assert items["Pão"].sector_pending is False
+    assert submitted == [(items["Xyzzy"].id, "Xyzzy")]
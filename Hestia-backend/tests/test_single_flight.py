@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.ai_service import OllamaService
+from app.services.scheduler import PRIORITY_CLASSIFICATION, PRIORITY_GENERATION
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_one_key_share_one_call():
+    async def run():
+        flight, calls = SingleFlight(), []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "done"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(3)), flight.do("other", work))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(run())
+
+    assert results == ["done"] * 4
+    assert len(calls) == 2
+    assert stats == {"started": 2, "coalesced": 2, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_the_key_is_released():
+    async def run():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        return results, flight.stats()
+
+    results, stats = asyncio.run(run())
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert stats["in_flight"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def run():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "embedding_index_dir", str(tmp_path))
+    service = OllamaService()
+    service.generate_calls = []
+
+    async def handler(request):
+        service.generate_calls.append(json.loads(request.content)["prompt"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"response": "bebidas", "done": True})
+
+    for backend in service.pool.backends:
+        backend._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=backend.url)
+    return service
+
+
+def test_identical_requests_share_one_ollama_call(service):
+    async def run():
+        return await asyncio.gather(*(service._make_request("Classifique", PRIORITY_CLASSIFICATION, 15) for _ in range(3)))
+
+    assert asyncio.run(run()) == ["bebidas"] * 3
+    assert len(service.generate_calls) == 1
+
+
+def test_requests_with_another_priority_or_deadline_are_not_coalesced(service):
+    async def run():
+        return await asyncio.gather(
+            service._make_request("Classifique", PRIORITY_CLASSIFICATION, 15),
+            service._make_request("Classifique", PRIORITY_GENERATION, 15),
+            service._make_request("Classifique", PRIORITY_CLASSIFICATION, 90),
+        )
+
+    assert asyncio.run(run()) == ["bebidas"] * 3
+    assert len(service.generate_calls) == 3